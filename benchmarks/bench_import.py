@@ -0,0 +1,75 @@
+"""
+Measures how long ``import pyedahelper.pyedahelper`` takes in a fresh
+interpreter, and checks that it loads none of the libraries that the
+package only imports when a function needs them.
+
+Usage::
+
+    python benchmarks/bench_import.py --repeat 10 --max-seconds 1.0
+
+The best and median times of the runs are printed; the script exits with
+status 1 if a lazily imported library was loaded or if the median exceeds
+--max-seconds.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+LAZY_MODULES = ["matplotlib", "seaborn", "altair", "scipy"]
+
+# the probe runs from the repository root, where python -c finds the package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import pyedahelper.pyedahelper
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed,
+                  "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def measure(repeat):
+    """
+    Imports the package in repeat fresh interpreters and returns the import
+    times along with the lazily imported modules that were loaded.
+    """
+    seconds = list()
+    loaded = set()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", PROBE], check=True,
+                                capture_output=True, text=True,
+                                cwd=ROOT).stdout
+        result = json.loads(output)
+        seconds.append(result["seconds"])
+        loaded.update(result["loaded"])
+    return seconds, sorted(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    seconds, loaded = measure(args.repeat)
+    median = statistics.median(seconds)
+    print("import pyedahelper: best %.3fs, median %.3fs over %d runs"
+          % (min(seconds), median, len(seconds)))
+    failed = False
+    if loaded:
+        print("lazily imported modules loaded at import: " + ", ".join(
+            loaded))
+        failed = True
+    if args.max_seconds is not None and median > args.max_seconds:
+        print("median import time exceeds %.3fs" % args.max_seconds)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Benchmarks of the public functions of pyedahelper on synthetic data frames.
+
+Every benchmark is timed (best of --repeat runs) and then run once more
+under tracemalloc to record the peak memory it allocates, numpy buffers
+included. Chart benchmarks also record the size of the serialized chart.
+
+Usage::
+
+    python benchmarks/run.py --scale medium --save baseline.json
+    python benchmarks/run.py --scale medium --compare baseline.json
+
+Scales set the shape of the frames, and --rows, --cols and --nan-rate
+override them. With --compare, the script exits with status 1 if a
+benchmark got slower or allocates more than --tolerance times its baseline
+(measured on the same scale).
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import pyedahelper  # noqa: E402
+from pyedahelper import pyedahelper as eda  # noqa: E402
+
+SCALES = {"small": (10 ** 4, 10),
+          "medium": (10 ** 6, 20),
+          "large": (10 ** 7, 20),
+          "huge": (10 ** 8, 10),
+          "wide": (10 ** 4, 2000)}
+
+
+def make_frame(rows, cols, nan_rate=0.05, seed=0):
+    """
+    Synthetic data frame of the given shape with a date column followed by
+    a mix of float64, float32, int64 and string columns. A fraction
+    nan_rate of the float and string values is missing; integer columns
+    have no missing values so that they keep their dtype.
+    """
+    rng = np.random.default_rng(seed)
+    data = {"date": pd.date_range("2000-01-01", periods=rows, freq="min")}
+    kinds = ["float64", "float32", "int64", "str"]
+    for j in range(cols - 1):
+        kind = kinds[j % len(kinds)]
+        if kind == "int64":
+            data["c%d" % j] = rng.integers(0, 1000, rows)
+            continue
+        if kind == "str":
+            values = pd.Categorical.from_codes(
+                rng.integers(0, 20, rows),
+                ["level%d" % i for i in range(20)]).astype(object)
+        else:
+            values = rng.standard_normal(rows).astype(kind)
+        values[rng.random(rows) < nan_rate] = np.nan
+        data["c%d" % j] = values
+    return pd.DataFrame(data)
+
+
+def numeric_columns(frame):
+    return [col for col in frame.columns[1:]
+            if pd.api.types.is_numeric_dtype(frame[col])]
+
+
+def chart_size(chart):
+    return len(json.dumps(chart.to_dict()))
+
+
+def corr_render(frame):
+    cols = numeric_columns(frame)[:50]
+    with tempfile.TemporaryDirectory() as tmp, \
+            contextlib.redirect_stdout(io.StringIO()):
+        eda.fast_corr(frame, cols, save_path=os.path.join(tmp, "corr.png"))
+
+
+def benchmarks(frame):
+    """
+    The benchmarks to run on frame, as a dict of name to a function that
+    runs it and returns an optional dict of extra measurements.
+    """
+    cols = list(frame.columns[1:])
+    num = numeric_columns(frame)
+    y = num[0]
+    return {
+        "fast_outlier_id[z-score]":
+            lambda: eda.fast_outlier_id(frame, cols, "z-score"),
+        "fast_outlier_id[interquartile]":
+            lambda: eda.fast_outlier_id(frame, cols, "interquartile"),
+        "fast_outlier_id[interquartile,sketch]":
+            lambda: eda.fast_outlier_id(frame, cols, "interquartile",
+                                        quantile_engine="sketch"),
+        "fast_missing_impute[mean]":
+            lambda: eda.fast_missing_impute(frame, "mean", num),
+        "fast_missing_impute[median]":
+            lambda: eda.fast_missing_impute(frame, "median", num),
+        "fast_missing_impute[median,sketch]":
+            lambda: eda.fast_missing_impute(frame, "median", num,
+                                            quantile_engine="sketch"),
+        "fast_missing_impute[mode]":
+            lambda: eda.fast_missing_impute(frame, "mode", cols),
+        "fast_corr_matrix[pearson]":
+            lambda: eda.fast_corr_matrix(frame, num),
+        "fast_corr_matrix[spearman]":
+            lambda: eda.fast_corr_matrix(frame, num, method="spearman"),
+        "fast_corr[render]": lambda: corr_render(frame),
+        "fast_plot[scatter]": lambda: {"spec_bytes": chart_size(
+            eda.fast_plot(frame, y, num[1 % len(num)], "scatter"))},
+        "fast_plot[line]": lambda: {"spec_bytes": chart_size(
+            eda.fast_plot(frame, "date", y, "line"))},
+        "fast_plots[line]": lambda: {"spec_bytes": chart_size(
+            eda.fast_plots(frame, [("date", col, "line")
+                                   for col in num[:10]]))},
+    }
+
+
+def measure(func, repeat):
+    """
+    Best wall time of repeat runs of func, peak traced memory of one more
+    run, and the extra measurements returned by func.
+    """
+    times = list()
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        extra = func()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result = {"seconds": min(times), "peak_bytes": peak}
+    if isinstance(extra, dict):
+        result.update(extra)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints the ratios of results to baseline and returns the benchmarks
+    whose time or memory grew by more than tolerance.
+    """
+    regressions = list()
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for key in ["seconds", "peak_bytes"]:
+            ratio = result[key] / max(baseline[name][key], 1e-9)
+            print("%-40s %-10s x%.2f" % (name, key, ratio))
+            if ratio > 1 + tolerance:
+                regressions.append((name, key, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--rows", type=int, default=None)
+    parser.add_argument("--cols", type=int, default=None)
+    parser.add_argument("--nan-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", default="",
+                        help="only run the benchmarks containing this text")
+    parser.add_argument("--save", default=None,
+                        help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None,
+                        help="compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    rows, cols = SCALES[args.scale]
+    rows = args.rows or rows
+    cols = args.cols or cols
+    frame = make_frame(rows, cols, args.nan_rate)
+    print("frame: %d rows x %d columns, %.1f MB" % (
+        rows, cols, frame.memory_usage(deep=True).sum() / 2 ** 20))
+
+    results = dict()
+    for name, func in benchmarks(frame).items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(func, args.repeat)
+        print("%-40s %9.4fs %10.1f MB" % (
+            name, results[name]["seconds"],
+            results[name]["peak_bytes"] / 2 ** 20))
+
+    report = {"version": pyedahelper.__version__,
+              "python": platform.python_version(),
+              "numpy": np.__version__,
+              "pandas": pd.__version__,
+              "rows": rows, "cols": cols, "nan_rate": args.nan_rate,
+              "results": results}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        assert (baseline["rows"], baseline["cols"]) == (rows, cols), \
+            "the baseline was measured on frames of another shape"
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for name, key, ratio in regressions:
+            print("REGRESSION %s %s x%.2f" % (name, key, ratio))
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,97 @@
+import collections
+import contextlib
+import datetime
+import decimal
+import hashlib
+import json
+import os
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from scipy import stats
-from statistics import mode
-import altair as alt
+
+# The plotting libraries and scipy are imported by the functions that use
+# them: they take most of the import time and pyplot sets up a matplotlib
+# backend, which workers that never plot should not pay for.
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
 
 
 def fast_outlier_id(data, cols="All", method="z-score",
-                    threshold_low_freq=0.05):
+                    threshold_low_freq=0.05, quantile_engine="exact",
+                    quantile_error=0.01, output="values", n_jobs=None,
+                    stats=None, threshold=None):
     """
     The function takes in a dataframe and analyzes the values of a given column
-    list, and identifies outliers using either the ZScore algorithm or
-    interquantile range algorithm. The return is a dataframe containing the
-    following columns: column name, list containing the outlier's index
-    position, percentage of total counts considered outliers.
+    list, and identifies outliers using either the ZScore algorithm, the
+    interquantile range algorithm or the median absolute deviation. The
+    return is a dataframe containing the following columns: column name,
+    the outliers found (their values, or their index positions, see
+    output), percentage of total counts considered outliers. Numeric columns
+    are analyzed together as a single 2-D array, so wide data frames are
+    scanned once rather than column by column.
 
     Parameters
     ----------
-    data: pandas.core.frame.DataFrame
-      The data that will be analyzed.
+    data: pandas.core.frame.DataFrame, pyarrow.Table or polars.DataFrame
+      The data that will be analyzed. Arrow tables and Polars data frames
+      are read without converting them to pandas: their numeric buffers
+      are wrapped as they are, and the summary is returned in the same
+      library, with the column types of data and, when numeric and
+      categorical columns are mixed, the outlier values as strings.
+      Polars data frames require pyarrow.
     method: str
-      The method to be applied to the data in search for outliers.
+      The method to be applied to the data in search for outliers: "z-score"
+      flags values more than threshold standard deviations away from the
+      mean, "interquartile" values more than threshold interquartile ranges
+      below the first or above the third quartile, and "mad" values whose
+      modified z-score 0.6745 * (x - median) / MAD exceeds threshold in
+      absolute value, MAD being the median absolute deviation from the
+      median. The robust "mad" method suits heavy-tailed data; when more
+      than half of the values of a column are equal its MAD is 0 and every
+      other value is flagged.
     cols: list
       The column names to be analyzed.
     threshold_low_freq: flt
       Threshold indicating value at which a frequency is considered to be an
       outlier for categorical values.
+    quantile_engine: str
+      How the quartiles of the "interquartile" method and the medians of the
+      "mad" method are computed: "exact" partially sorts every column,
+      "sketch" estimates them in linear time and bounded memory with a
+      mergeable quantile sketch.
+    quantile_error: flt
+      Approximate rank error of the quantiles when quantile_engine="sketch".
+    output: str
+      How the outliers of each column are returned: "values" (the outlier
+      values, or the rare categories of categorical columns), "index"
+      (positions of the outlier rows as an int32 array, int64 for frames of
+      2**31 rows or more), "mask" (a boolean array with one entry per row)
+      or "bitset" (the same mask packed into bits with numpy.packbits).
+    n_jobs: int
+      Number of worker processes the numeric columns are sharded across.
+      None or 1 runs serially, -1 uses every CPU. The results are identical
+      to the serial ones.
+    stats: Profile
+      Statistics of data computed by profile(). The outlier bounds and
+      category counts are then taken from it instead of being computed, and
+      quantile_engine and n_jobs are ignored. The "mad" method still
+      computes the bounds of the numeric columns.
+    threshold: flt
+      Cut-off of the method, by default 2 for "z-score", 1.5 for
+      "interquartile" and 3.5 for "mad".
 
     Returns
     -------
     dataframe
-        A dataframe containing a summary of outliers found.
+        A dataframe containing a summary of outliers found. The outliers are
+        in the "outlier_values", "outlier_index", "outlier_mask" or
+        "outlier_bitset" column depending on output.
 
     Examples
     ------------------------
@@ -44,25 +104,32 @@ def fast_outlier_id(data, cols="All", method="z-score",
 
     """
 
+    columnar = data
+    data, library = _columnar_frame(data)
+    stages = _stages("fast_outlier_id", data)
+
     # ASSERT TESTS
     assert isinstance(data, pd.DataFrame), "Data must be in pandas Data Frame!"
 
-    if type(cols) == str:
-        if cols.lower() == "all":
-            cols = list(data.columns)
-
-    if type(cols) != str:
-        assert isinstance(cols, list), "Columns must be inputted in a list"
-        for i in cols:
-            assert i in list(
-                data.columns), "Columns must exist in the inputted data " \
-                               "dataframe"
-
-    assert method.lower() in ["z-score",
-                              "interquartile"], \
-        "The only permitted values are z-score or interquantile,thank you"
+    cols = _check_outlier_args(list(data.columns), cols, method)
+    _check_quantile_args(quantile_engine, quantile_error)
+    assert output in ["values", "index", "mask", "bitset"], \
+        "output must be one of 'values', 'index', 'mask' or 'bitset'"
+    n_jobs = _check_n_jobs(n_jobs)
+    threshold = _check_threshold(method, threshold)
+    if stats is not None:
+        _check_stats(stats, data, cols)
+    elif _stats_cache is not None:
+        # the "mad" method computes its own numeric statistics, so only the
+        # category counts are worth caching for it
+        stats = _cached_profile(
+            data, [i for i in cols if _is_categorical(data[i].dtype) or (
+                _is_numeric(data[i].dtype) and method.lower() != "mad")],
+            quantile_engine, quantile_error, method.lower() == "interquartile")
+    stages.done("validation")
 
     # Initialize lists containing summary values
+    col_name_list = list()
     no_nans_list = list()
     col_type_list = list()
     perc_nans_list = list()
@@ -73,56 +140,770 @@ def fast_outlier_id(data, cols="All", method="z-score",
 
     # Subsetting the data by the columns selected by the user
     subset = data[cols]
+
+    # Numeric columns are analyzed together, one 2-D block per dtype, so the
+    # statistics and outlier masks of every column come out of one pass
+    # without upcasting narrow columns to float64
+    num_cols = [i for i in cols if _is_numeric(subset[i].dtype)]
+    no_valid = dict()
+    outliers = dict()
+    for group in _dtype_groups(subset, num_cols):
+        if stats is None or method.lower() == "mad":
+            shards = _map_column_shards(_outlier_shard, subset[group],
+                                        n_jobs, method.lower(),
+                                        quantile_engine, quantile_error,
+                                        threshold)
+            group_valid = np.concatenate([shard[0] for shard in shards])
+            group_outliers = np.hstack([shard[1] for shard in shards])
+        else:
+            # only the comparison with the known bounds is left to do
+            block, valid = _numeric_block(subset[group])
+            lower, upper = stats._bounds(group, method.lower(), threshold)
+            group_valid = stats.numeric.loc[group, "count"].to_numpy(
+                dtype=np.int64)
+            group_outliers = valid & ((block < lower) | (block > upper))
+            del block, valid
+        for j, col in enumerate(group):
+            no_valid[col] = group_valid[j]
+            outliers[col] = group_outliers[:, j]
+    stages.done("numeric outliers", cols=len(num_cols))
+    method_name = _METHOD_NAMES[method.lower()]
+
     for i in cols:
+        if i in outliers:
+            no_nans = len(subset) - no_valid[i]
+            no_outliers = outliers[i].sum()
+            outlier_count_list.append(no_outliers)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                outlier_perc_list.append(
+                    round(no_outliers / no_valid[i], 2))
+            if output == "values":
+                outlier_values_list.append(
+                    subset[i].to_numpy()[outliers[i]])
+            else:
+                outlier_values_list.append(
+                    _format_outliers(outliers[i], output))
+            method_list.append(method_name)
+        elif _is_categorical(subset[i].dtype):
+            if stats is not None and output == "values":
+                categories, counts, _ = stats.categories[i]
+                no_nans = stats.no_nans[i]
+            else:
+                codes, categories = _factorize(subset[i])
+                valid = codes >= 0
+                no_nans = len(codes) - valid.sum()
+                counts = np.bincount(codes[valid],
+                                     minlength=len(categories))
+            no_present = len(subset) - no_nans
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rare = (counts > 0) & (counts / no_present <
+                                       threshold_low_freq)
+            outlier_count_list.append(counts[rare].sum())
+            outlier_perc_list.append(
+                round(counts[rare].sum() / max(no_present, 1), 2))
+            if output == "values":
+                # most frequent first, ties in order of first appearance
+                order = np.argsort(-counts[rare], kind="mergesort")
+                outlier_values_list.append(
+                    np.asarray(categories)[rare][order].tolist())
+            else:
+                outlier_values_list.append(_format_outliers(
+                    valid & rare[np.maximum(codes, 0)], output))
+            method_list.append("low-freq")
+        else:
+            continue
         # More lists containing summary values
-        no_nans = subset[i].isna().sum()
+        col_name_list.append(i)
         no_nans_list.append(no_nans)
         col_type_list.append(subset[i].dtype)
         perc_nans_list.append(round(no_nans / len(subset[i]), 2))
-        data_no_nans = subset[i][~pd.isna(subset[i])]
-        if data_no_nans.dtypes in ['float64', 'int64']:
-            if method.lower() == "z-score":
-                score = np.abs(stats.zscore(data_no_nans))
-                data_no_nans = data_no_nans.to_numpy()
-                outlier_values = data_no_nans[np.where(score > 2)]
-                outlier_count_list.append(len(outlier_values))
-                outlier_perc_list.append(
-                    round(len(outlier_values) / len(data_no_nans), 2))
-                outlier_values_list.append(outlier_values)
-                method_list.append("Z-Score")
-            elif method.lower() == "interquartile":
-                Q1 = np.quantile(data_no_nans, 0.25)
-                Q3 = np.quantile(data_no_nans, 0.75)
-                IQR = Q3 - Q1
-                score = (data_no_nans < (Q1 - 1.5 * IQR)) | (
-                            data_no_nans > (Q3 + 1.5 * IQR))
-                data_no_nans = data_no_nans.to_numpy()
-                outlier_values = data_no_nans[np.where(score > 0)]
-                outlier_count_list.append(len(outlier_values))
-                outlier_perc_list.append(
-                    round(len(outlier_values) / len(data_no_nans), 2))
-                outlier_values_list.append(outlier_values)
-                method_list.append("Interquartile")
-        elif data_no_nans.dtype in ['object']:
-            score = data_no_nans.value_counts() / len(data_no_nans)
-            outlier_values = score[score < threshold_low_freq].index.tolist()
-            outlier_count_list.append(
-                data_no_nans.value_counts()[score < threshold_low_freq].sum())
-            outlier_perc_list.append(
-                round(sum(score[score < threshold_low_freq]), 2))
-            outlier_values_list.append(outlier_values)
-            method_list.append("low-freq")
-    summary_dict = {'column_name': cols, 'type': col_type_list,
+    summary_dict = {'column_name': col_name_list, 'type': col_type_list,
                     'no_nans': no_nans_list, 'perc_nans': perc_nans_list,
                     'outlier_method': method_list,
                     "no_outliers": outlier_count_list,
                     "perc_outliers": outlier_perc_list,
-                    "outlier_values": outlier_values_list}
+                    "outlier_" + output: outlier_values_list}
     summary = pd.DataFrame(summary_dict)
+    if library is not None:
+        summary = _columnar_summary(summary, columnar, library)
+    stages.done("categorical outliers and summary", cols=len(cols))
+    return (summary)
+
+
+def fast_outlier_id_chunked(chunks, cols="All", method="z-score",
+                            threshold_low_freq=0.05, quantile_error=0.01,
+                            threshold=None):
+    """
+    Streaming version of fast_outlier_id for data that does not fit in
+    memory. The data is read twice, one chunk at a time: the first pass
+    accumulates mergeable statistics (running mean and variance for the
+    z-score, a quantile sketch for the interquartile fences and value counts
+    for categorical columns), the second pass flags the outliers. Memory use
+    is bounded by the chunk size rather than by the size of the data.
+
+    Parameters
+    ----------
+    chunks: callable or iterable
+      Either a function returning a fresh iterable of data frames, such as
+      ``lambda: pd.read_csv(path, chunksize=10 ** 6)``, or an iterable that
+      can be traversed twice, such as a list of data frames.
+    cols: list
+      The column names to be analyzed.
+    method: str
+      The method to be applied to the data in search for outliers, either
+      "z-score" or "interquartile"; the "mad" method of fast_outlier_id
+      would need a third pass over the data and is not available.
+    threshold_low_freq: flt
+      Threshold indicating value at which a frequency is considered to be an
+      outlier for categorical values.
+    quantile_error: flt
+      Approximate rank error of the quartiles used by the "interquartile"
+      method.
+    threshold: flt
+      Cut-off of the method, as in fast_outlier_id.
+
+    Returns
+    -------
+    dataframe
+        A dataframe containing a summary of outliers found, with the
+        positions of the outliers (counted over all chunks) in the
+        "outlier_index" column, as in fast_outlier_id(output="index").
+
+    Examples
+    ------------------------
+    >>> fast_outlier_id_chunked(
+    >>>     lambda: pd.read_csv("data.csv", chunksize=100000),
+    >>>     method="interquartile")
+
+    """
+    # ASSERT TESTS
+    if not callable(chunks):
+        assert iter(chunks) is not iter(chunks), \
+            "chunks must be re-iterable or a function returning the chunks"
+    _check_quantile_args("sketch", quantile_error)
+    assert method.lower() != "mad", \
+        "fast_outlier_id_chunked does not support the mad method"
+    threshold = _check_threshold(method, threshold)
+
+    # First pass: accumulate the statistics of every column
+    n_rows = 0
+    for chunk in _iter_chunks(chunks):
+        assert isinstance(chunk, pd.DataFrame), \
+            "Chunks must be in pandas Data Frame!"
+        if n_rows == 0:
+            cols = _check_outlier_args(list(chunk.columns), cols, method)
+            num_cols = [i for i in cols if _is_numeric(chunk[i].dtype)]
+            cat_cols = [i for i in cols
+                        if _is_categorical(chunk[i].dtype)]
+            col_types = {i: chunk[i].dtype for i in cols}
+            no_nans = dict.fromkeys(num_cols + cat_cols, 0)
+            moments = _RunningMoments(len(num_cols))
+            sketches = [_QuantileSketch(quantile_error)
+                        for _ in num_cols]
+            counts = {i: pd.Series(dtype="int64") for i in cat_cols}
+        n_rows += len(chunk)
+        block = chunk[num_cols].to_numpy(dtype=np.float64,
+                                         na_value=np.nan)
+        if method.lower() == "z-score":
+            moments.update(block)
+        else:
+            for j, sketch in enumerate(sketches):
+                sketch.update(block[:, j])
+        for j, i in enumerate(num_cols):
+            no_nans[i] += int(np.isnan(block[:, j]).sum())
+        for i in cat_cols:
+            no_nans[i] += int(chunk[i].isna().sum())
+            counts[i] = counts[i].add(chunk[i].value_counts(), fill_value=0)
+    assert n_rows > 0, "chunks must contain at least one row"
+
+    # Outlier bounds of the numeric columns
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method.lower() == "z-score":
+            lower, upper = _outlier_bounds("z-score", threshold,
+                                           mean=moments.mean,
+                                           std=moments.std)
+        else:
+            q1, q3 = np.array([sketch.quantile([0.25, 0.75])
+                               for sketch in sketches]).reshape(-1, 2).T
+            lower, upper = _outlier_bounds("interquartile", threshold,
+                                           q1=q1, q3=q3)
+    low_freq = dict()
+    for i in cat_cols:
+        score = counts[i] / counts[i].sum()
+        low_freq[i] = score[score < threshold_low_freq].index
+
+    # Second pass: flag the outliers chunk by chunk
+    positions = {i: list() for i in num_cols + cat_cols}
+    offset = 0
+    for chunk in _iter_chunks(chunks):
+        block = chunk[num_cols].to_numpy(dtype=np.float64,
+                                         na_value=np.nan)
+        flagged = (block < lower) | (block > upper)
+        for j, i in enumerate(num_cols):
+            positions[i].append(np.flatnonzero(flagged[:, j]) + offset)
+        for i in cat_cols:
+            positions[i].append(
+                np.flatnonzero(chunk[i].isin(low_freq[i])) + offset)
+        offset += len(chunk)
+
+    method_name = _METHOD_NAMES[method.lower()]
+    rows = list()
+    for i in cols:
+        if i not in positions:
+            continue
+        index = np.concatenate(positions[i]).astype(
+            np.int32 if n_rows < 2 ** 31 else np.int64)
+        no_valid = n_rows - no_nans[i]
+        rows.append({'column_name': i,
+                     'type': col_types[i],
+                     'no_nans': no_nans[i],
+                     'perc_nans': round(no_nans[i] / n_rows, 2),
+                     'outlier_method': method_name if i in num_cols
+                     else "low-freq",
+                     "no_outliers": len(index),
+                     "perc_outliers": round(len(index) / no_valid, 2)
+                     if no_valid > 0 else np.nan,
+                     "outlier_index": index})
+    summary = pd.DataFrame(rows, columns=[
+        'column_name', 'type', 'no_nans', 'perc_nans', 'outlier_method',
+        'no_outliers', 'perc_outliers', 'outlier_index'])
     return (summary)
 
 
-def fast_plot(df, x, y, plot_type):
+def _iter_chunks(chunks):
+    """
+    Returns a fresh iterator over the chunks passed to the streaming
+    functions.
+    """
+    if callable(chunks):
+        return iter(chunks())
+    return iter(chunks)
+
+
+def _check_outlier_args(columns, cols, method):
+    """
+    Validates the column selection and method shared by the outlier
+    functions, and expands cols="All" into the full column list.
+    """
+    if type(cols) == str:
+        if cols.lower() == "all":
+            cols = list(columns)
+
+    if type(cols) != str:
+        assert isinstance(cols, list), "Columns must be inputted in a list"
+        for i in cols:
+            assert i in columns, "Columns must exist in the inputted data " \
+                                 "dataframe"
+
+    assert method.lower() in ["z-score", "interquartile", "mad"], \
+        "The only permitted values are z-score, interquantile or mad, " \
+        "thank you"
+    return cols
+
+
+def _check_threshold(method, threshold):
+    """
+    Validates the threshold of the outlier functions and returns it, or the
+    default threshold of method when it is None.
+    """
+    if threshold is None:
+        return _DEFAULT_THRESHOLDS[method.lower()]
+    assert isinstance(threshold, (int, float)) and not isinstance(
+        threshold, bool) and threshold > 0, \
+        "threshold must be None or a positive number"
+    return threshold
+
+
+# Cut-offs of the outlier methods when no threshold is given
+_DEFAULT_THRESHOLDS = {"z-score": 2, "interquartile": 1.5, "mad": 3.5}
+
+# Names of the outlier methods in the summaries
+_METHOD_NAMES = {"z-score": "Z-Score", "interquartile": "Interquartile",
+                 "mad": "MAD"}
+
+
+def _format_outliers(flagged, output):
+    """
+    Converts the boolean outlier mask of a column into the representation
+    requested through the output argument of fast_outlier_id.
+    """
+    if output == "index":
+        dtype = np.int32 if len(flagged) < 2 ** 31 else np.int64
+        return np.flatnonzero(flagged).astype(dtype)
+    if output == "bitset":
+        return np.packbits(flagged)
+    return np.ascontiguousarray(flagged)
+
+
+def _outlier_shard(frame, method, quantile_engine, quantile_error,
+                   threshold=None):
+    """
+    Returns the number of non-missing values and the outlier mask of the
+    numeric columns of frame, which share a single dtype.
+    """
+    block, valid = _numeric_block(frame)
+    return valid.sum(axis=0), _numeric_outlier_mask(
+        block, valid, method, quantile_engine, quantile_error, threshold)
+
+
+def _is_numeric(dtype):
+    """
+    Whether a column of this dtype is treated as numeric: any integer or
+    float dtype, including the nullable Int and Float extension dtypes, but
+    not booleans.
+    """
+    return pd.api.types.is_numeric_dtype(dtype) and \
+        not pd.api.types.is_bool_dtype(dtype)
+
+
+def _dtype_groups(frame, cols):
+    """
+    Splits cols into lists of columns sharing the same dtype, in order of
+    first appearance.
+    """
+    groups = dict()
+    for col in cols:
+        groups.setdefault(frame[col].dtype, list()).append(col)
+    return list(groups.values())
+
+
+def _numeric_block(frame):
+    """
+    Returns the values of the numeric columns of frame, which share a single
+    dtype, as a 2-D column-major array in their native width, together with
+    the boolean mask of the non-missing entries. Nullable columns are
+    unpacked into their numpy dtype, with missing entries set to NaN for
+    floats and 0 for integers.
+    """
+    dtype = frame.dtypes.iloc[0]
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        np_dtype = dtype.numpy_dtype
+        block = np.asfortranarray(frame.to_numpy(
+            dtype=np_dtype, na_value=np.nan if np_dtype.kind == "f" else 0))
+        valid = np.asfortranarray(frame.notna().to_numpy())
+    else:
+        block = np.asfortranarray(frame.to_numpy())
+        valid = np.ones(block.shape, dtype=bool, order="F")
+    if block.dtype.kind == "f":
+        valid &= ~np.isnan(block)
+    return block, valid
+
+
+def _column_buffer(series):
+    """
+    Returns the values of a numeric column without copying them, together
+    with the mask of its non-missing entries for nullable columns (None for
+    numpy columns, whose missing entries are NaN).
+    """
+    values = series.array
+    if isinstance(getattr(values, "_mask", None), np.ndarray):
+        return values._data, ~values._mask
+    return series.to_numpy(), None
+
+
+def _work_dtype(dtype):
+    """
+    The float dtype deviations from the mean of a column are computed in:
+    the column's own dtype for floats, float32 for integers of up to 16 bits
+    (which it represents exactly) and float64 for wider integers.
+    """
+    if dtype.kind == "f":
+        return dtype
+    return np.dtype(np.float32) if dtype.itemsize <= 2 \
+        else np.dtype(np.float64)
+
+
+def _check_n_jobs(n_jobs):
+    """
+    Validates n_jobs and returns the number of worker processes to use.
+    """
+    assert n_jobs is None or (isinstance(n_jobs, int) and n_jobs != 0), \
+        "n_jobs must be None or a non-zero integer"
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(os.cpu_count() + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def _map_column_shards(func, frame, n_jobs, *args):
+    """
+    Applies func(shard, *args) to contiguous column shards of frame and
+    returns the results in column order. With more than one job the shards
+    are processed by a pool of worker processes. Frames holding a single
+    numpy numeric dtype are copied once, in that dtype, into a shared memory
+    buffer that the workers attach to, so only the shard boundaries are
+    pickled; other frames are pickled shard by shard.
+    """
+    n_jobs = min(n_jobs, frame.shape[1])
+    if n_jobs <= 1:
+        return [func(frame, *args)]
+    shards = [(cols[0], cols[-1] + 1)
+              for cols in np.array_split(np.arange(frame.shape[1]), n_jobs)]
+    dtypes = set(frame.dtypes)
+    dtype = dtypes.pop()
+    shareable = len(dtypes) == 0 and _is_numeric(dtype) and not isinstance(
+        dtype, pd.api.extensions.ExtensionDtype)
+    if not shareable or shared_memory is None:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(func, frame.iloc[:, start:stop], *args)
+                       for start, stop in shards]
+            return [future.result() for future in futures]
+
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(frame.shape[0], 1) * frame.shape[1] *
+        dtype.itemsize)
+    try:
+        shared = np.ndarray(frame.shape, dtype=dtype, buffer=shm.buf,
+                            order="F")
+        for j in range(frame.shape[1]):
+            shared[:, j] = frame.iloc[:, j].to_numpy()
+        del shared
+        columns = list(frame.columns)
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(_shared_shard, func, shm.name, frame.shape,
+                                   dtype.str, start, stop,
+                                   columns[start:stop], args)
+                       for start, stop in shards]
+            return [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _shared_shard(func, name, shape, dtype, start, stop, columns, args):
+    """
+    Worker side of _map_column_shards: attaches to the shared buffer and
+    applies func to a data frame viewing the columns start:stop.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        block = np.ndarray(shape, dtype=dtype, buffer=shm.buf, order="F")
+        shard = pd.DataFrame(block[:, start:stop], columns=columns,
+                             copy=False)
+        result = func(shard, *args)
+        del block, shard
+        return result
+    finally:
+        shm.close()
+
+
+def _is_categorical(dtype):
+    """
+    Whether a column of this dtype is analyzed for low-frequency values:
+    object, pandas string and categorical columns.
+    """
+    return pd.api.types.is_object_dtype(dtype) or isinstance(
+        dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+
+def _factorize(series):
+    """
+    Encodes a column as integer codes (-1 for missing values) and the array
+    of distinct values the codes refer to. Categorical columns reuse their
+    existing codes instead of hashing the values again.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return (series.cat.codes.to_numpy(dtype=np.intp),
+                series.cat.categories)
+    codes, uniques = pd.factorize(series)
+    return codes.astype(np.intp, copy=False), uniques
+
+
+def _check_quantile_args(quantile_engine, quantile_error):
+    """
+    Validates the quantile engine options.
+    """
+    assert quantile_engine in ["exact", "sketch"], \
+        "quantile_engine must be either 'exact' or 'sketch'"
+    assert 0 < quantile_error < 1, "quantile_error must be between 0 and 1"
+
+
+def _column_quantiles(block, valid, q, quantile_engine="exact",
+                      quantile_error=0.01):
+    """
+    Returns the quantiles q of the non-missing entries of every column of a
+    2-D array, as a float array of shape (len(q), number of columns).
+    """
+    if quantile_engine == "exact" and valid.all():
+        return np.quantile(block, q, axis=0)
+    if quantile_engine == "exact" and block.dtype.kind == "f":
+        return np.nanquantile(block, q, axis=0)
+    quantiles = np.full((len(q), block.shape[1]), np.nan)
+    for j in range(block.shape[1]):
+        if quantile_engine == "exact":
+            values = block[valid[:, j], j]
+            if len(values) > 0:
+                quantiles[:, j] = np.quantile(values, q)
+        else:
+            # the sketch reads the column slice by slice, without copying it
+            sketch = _QuantileSketch(quantile_error)
+            sketch.update(block[:, j], valid[:, j])
+            quantiles[:, j] = sketch.quantile(q)
+    return quantiles
+
+
+def _numeric_outlier_mask(block, valid, method, quantile_engine="exact",
+                          quantile_error=0.01, threshold=None):
+    """
+    Flags the outliers of every column of a 2-D numeric array at once, using
+    reductions along the rows. The sums are accumulated in float64 while the
+    data stays in its own width. Missing entries are ignored by the
+    statistics and are never flagged as outliers.
+
+    Parameters
+    ----------
+    block: numpy.ndarray
+      A 2-D numeric array with one column per analyzed data frame column.
+    valid: numpy.ndarray
+      Boolean array of the same shape as block, False for missing entries.
+    method: str
+      Either "z-score", "interquartile" or "mad".
+    quantile_engine: str
+      Either "exact" or "sketch", see fast_outlier_id.
+    quantile_error: flt
+      Approximate rank error of the sketch.
+    threshold: flt
+      Cut-off of the method, its default when None.
+
+    Returns
+    -------
+    numpy.ndarray
+        A boolean array of the same shape as block.
+    """
+    with warnings.catch_warnings(), \
+            np.errstate(invalid="ignore", divide="ignore"):
+        # all-missing columns produce "empty slice" warnings and NaN
+        # statistics, which simply flag nothing
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        if method == "z-score":
+            count, mean, std = _column_moments(block, valid)
+            lower, upper = _outlier_bounds(method, threshold, mean=mean,
+                                           std=std)
+        elif method == "interquartile":
+            q1, q3 = _column_quantiles(block, valid, [0.25, 0.75],
+                                       quantile_engine, quantile_error)
+            lower, upper = _outlier_bounds(method, threshold, q1=q1, q3=q3)
+        else:
+            median, mad = _column_mads(block, valid, quantile_engine,
+                                       quantile_error)
+            lower, upper = _outlier_bounds(method, threshold, median=median,
+                                           mad=mad)
+        return valid & ((block < lower) | (block > upper))
+
+
+def _column_moments(block, valid):
+    """
+    Returns the number of non-missing entries, the mean and the population
+    standard deviation of every column of a 2-D numeric array. The sums are
+    accumulated in float64 while the deviations stay in the working width
+    of the data.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        count = valid.sum(axis=0)
+        mean = np.sum(block, axis=0, dtype=np.float64, where=valid) / count
+        dev = np.subtract(block, mean, dtype=_work_dtype(block.dtype))
+        np.square(dev, out=dev)
+        std = np.sqrt(np.sum(dev, axis=0, dtype=np.float64,
+                             where=valid) / count)
+    return count, mean, std
+
+
+def _column_mads(block, valid, quantile_engine="exact", quantile_error=0.01):
+    """
+    Returns the median and the median absolute deviation from it of every
+    column of a 2-D numeric array. Both medians are selections done with
+    np.partition (or sketches), not full sorts, and the absolute deviations
+    are computed in the working width of the data.
+    """
+    median = _column_quantiles(block, valid, [0.5], quantile_engine,
+                               quantile_error)[0]
+    dev = np.subtract(block, median, dtype=_work_dtype(block.dtype))
+    np.abs(dev, out=dev)
+    mad = _column_quantiles(dev, valid, [0.5], quantile_engine,
+                            quantile_error)[0]
+    return median, mad
+
+
+def _outlier_bounds(method, threshold=None, mean=None, std=None, q1=None,
+                    q3=None, median=None, mad=None):
+    """
+    Returns the lower and upper bounds outside of which values are outliers,
+    from the mean and standard deviation for the "z-score" method, from the
+    quartiles for the "interquartile" method and from the median and median
+    absolute deviation for the "mad" method, where the modified z-score
+    0.6745 * (x - median) / mad exceeds threshold beyond the bounds.
+    """
+    if threshold is None:
+        threshold = _DEFAULT_THRESHOLDS[method]
+    if method == "z-score":
+        return mean - threshold * std, mean + threshold * std
+    if method == "interquartile":
+        return q1 - threshold * (q3 - q1), q3 + threshold * (q3 - q1)
+    spread = threshold * mad / 0.6745
+    return median - spread, median + spread
+
+
+class _RunningMoments:
+    """
+    Mergeable running count, mean and sum of squared deviations of every
+    column of a 2-D float array. Each block is summarized on its own and then
+    merged with the pairwise update of Chan et al., the block-wise form of
+    Welford's algorithm, so the result does not suffer from the cancellation
+    of the naive sum of squares.
+    """
+
+    def __init__(self, n_cols):
+        self.count = np.zeros(n_cols)
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+
+    def update(self, block):
+        """
+        Adds the rows of a 2-D float array, ignoring NaN entries.
+        """
+        other = _RunningMoments(block.shape[1])
+        other.count = (~np.isnan(block)).sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            other.mean = np.where(other.count > 0,
+                                  np.nansum(block, axis=0) / other.count, 0)
+        other.m2 = np.nansum((block - other.mean) ** 2, axis=0)
+        self.merge(other)
+
+    def merge(self, other):
+        """
+        Merges the moments accumulated by another instance into this one.
+        """
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(count > 0, other.count / count, 0)
+        self.mean = self.mean + delta * frac
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * frac
+        self.count = count
+
+    @property
+    def std(self):
+        """
+        Population standard deviation (ddof=0), NaN for empty columns.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.m2 / self.count)
+
+
+class _QuantileSketch:
+    """
+    Mergeable quantile sketch in the style of KLL (Karnin, Lang and Liberty).
+    Values are kept in a hierarchy of compactors; when a compactor overflows
+    its items are sorted and every other one is promoted to the next level,
+    where it stands for twice as many values. Memory stays around 3 * k
+    items whatever the number of values added. As long as nothing has been
+    compacted the quantiles are exact.
+
+    The compactor size k is derived from the requested normalized rank
+    error (k = 200 gives roughly a 1.65% error). Values are added in slices
+    of _batch_size. Once n values have been seen, the lowest levels are
+    replaced by a sampler, as in the KLL paper: every slice is cut into
+    runs of 2**h consecutive values, with 2**h <= n * error**2 / 4, and
+    one random value of each run enters level h directly. The sampler adds
+    a rank error of about error / 6 and only the sampled values are sorted,
+    so building the sketch is one vectorized pass over the data, and memory
+    is bounded by the slice size.
+    """
+
+    _batch_size = 2 ** 16
+
+    def __init__(self, error=0.0165, seed=0):
+        self.k = max(int(np.ceil(3.3 / error)), 8)
+        self.error = error
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values, valid=None):
+        """
+        Adds a 1-D array of values, ignoring NaN entries and, when valid is
+        given, the entries where it is False. Only one slice of the values
+        is converted to float64 at a time.
+        """
+        for start in range(0, len(values), self._batch_size):
+            batch = np.asarray(values[start:start + self._batch_size],
+                               dtype=np.float64)
+            keep = ~np.isnan(batch)
+            if valid is not None:
+                keep &= valid[start:start + self._batch_size]
+            batch = batch[keep]
+            self.count += len(batch)
+            level = int(np.log2(max(self.count * self.error ** 2 / 4, 1)))
+            step = 2 ** level
+            if step > 1:
+                n_runs = len(batch) // step
+                picks = np.arange(0, n_runs * step, step) + \
+                    self._rng.integers(step, size=n_runs)
+                rest = len(batch) - n_runs * step
+                # the incomplete last run is kept with probability
+                # rest / step, so that weights stay unbiased
+                if rest and self._rng.random() < rest / step:
+                    picks = np.append(picks, n_runs * step +
+                                      self._rng.integers(rest))
+                batch = batch[picks]
+            while len(self._levels) <= level:
+                self._levels.append(np.empty(0))
+            self._levels[level] = np.concatenate([self._levels[level],
+                                                  batch])
+            self._compress()
+
+    def merge(self, other):
+        """
+        Merges the values summarized by another sketch into this one.
+        """
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # with an odd number of items the smallest one stays behind
+                n_keep = len(items) % 2
+                promoted = items[n_keep + self._rng.integers(2)::2]
+                self._levels[level] = items[:n_keep]
+                self._levels[level + 1] = np.concatenate(
+                    [self._levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q):
+        """
+        Returns the estimated quantile(s) q of the values added so far.
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)
+        if len(self._levels) == 1:
+            return np.quantile(self._levels[0], q)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items_lvl), 2.0 ** level)
+                                  for level, items_lvl
+                                  in enumerate(self._levels)])
+        order = np.argsort(items, kind="mergesort")
+        cum_weights = np.cumsum(weights[order])
+        idx = np.searchsorted(cum_weights, np.asarray(q) * cum_weights[-1])
+        return items[order][np.minimum(idx, len(items) - 1)]
+
+
+def fast_plot(df, x, y, plot_type, max_points=5000, infer_dates=False,
+              transport="inline", data_dir=".", data_url=None):
     """
     The function takes in a dataframe, two column names for x and y axis and a
     plot type and creates the plot using the Altair library.
@@ -132,6 +913,11 @@ def fast_plot(df, x, y, plot_type):
     appropriate if both columns have categorical types. The plot only runs
     in Jupyter Lab/ Notebook.
 
+    Only the data the chart needs is embedded in it: sums shown by bar and
+    line charts are computed beforehand in pandas, and charts with more
+    than max_points points (or, for sums, groups) are downsampled, so the
+    size of the chart stays bounded however large the data frame is.
+
     Parameters
     ----------
     df: pandas.core.frame.DataFrame
@@ -142,6 +928,28 @@ def fast_plot(df, x, y, plot_type):
       The column name for the y variable.
     plot_type: str
       The type of plot from: {"scatter", "line", "bar"}.
+    max_points: int
+      Maximum number of points of the chart, counted after summing for bar
+      and line charts. Larger data is reduced with the Largest-Triangle-
+      Three-Buckets algorithm on the points sorted by their x value (their
+      y value for horizontal bars) when both columns are numeric or dates,
+      and by even sampling otherwise, which drops whole bars. None keeps
+      every point.
+    infer_dates: bool
+      Date columns are recognized from their datetime64 dtype (with or
+      without time zone). With infer_dates, object columns whose values,
+      checked on an evenly spaced sample, are all timestamps are treated as
+      dates too.
+    transport: str
+      How the chart gets its data: "inline" embeds it in the chart, "json"
+      or "csv" write it to a file in data_dir that the chart references by
+      URL, which keeps the chart specification small for rendering outside
+      of notebooks. Files are named after a hash of their content, so
+      charts showing the same data share a single file.
+    data_dir: str
+      Directory the data files are written to.
+    data_url: str
+      Base URL under which data_dir is served, data_dir itself by default.
 
     Returns
     -------
@@ -164,11 +972,137 @@ def fast_plot(df, x, y, plot_type):
 
     """
 
+    stages = _stages("fast_plot", df)
+
     # ASSERT TESTS
 
     # check that df is pd.DataFrame
     assert isinstance(df, pd.DataFrame), "Data must be in pandas Data Frame!"
 
+    (x_type, x_date), (y_type, y_date) = _check_plot_spec(
+        df, x, y, plot_type, infer_dates, dict())
+
+    assert transport in {"inline", "json", "csv"}, \
+        'transport must be either: "inline", "json" or "csv"'
+    assert max_points is None or (
+        isinstance(max_points, int) and max_points >= 3), \
+        "max_points must be None or an integer of at least 3!"
+
+    mark, x_arg, y_arg = _plot_encoding(x, y, plot_type, x_type, y_type,
+                                        x_date, y_date)
+    stages.done("validation", cols=2)
+
+    data = _plot_data(df, x, y, x_arg, y_arg, max_points)
+    stages.done("data reduction", cols=2)
+    if transport != "inline":
+        # data loaded from a URL carries no dtypes to infer the types from
+        x_arg = _typed_shorthand(x_arg, data[x], x_date)
+        y_arg = _typed_shorthand(y_arg, data[y], y_date)
+        rows = len(data)
+        data = _write_plot_data(data, transport, data_dir, data_url)
+        stages.done("data file", rows=rows, cols=2)
+    import altair as alt
+    chart = alt.Chart(data, mark=mark).encode(
+        x=alt.X(x_arg),
+        y=alt.Y(y_arg))
+    stages.done("chart", cols=2)
+
+    return chart.properties(width=900, height=600)
+
+
+def fast_plots(df, specs, columns=1, infer_dates=False, transport="inline",
+               data_dir=".", data_url=None, max_points=5000):
+    """
+    Creates many fast_plot charts from the same dataframe at once, laid out
+    in a grid. The columns are validated and classified once for all the
+    charts. Each chart gets the reduced data fast_plot would embed in it,
+    summed per group and downsampled to max_points rows, and charts with
+    the same data share it: inline data is registered once as a top-level
+    dataset named after its hash, and files are named after their content.
+    The size of the result is then bounded by the number of charts times
+    max_points, however large the data frame is.
+
+    Parameters
+    ----------
+    df: pandas.core.frame.DataFrame
+      The data that will be plotted.
+    specs: list
+      The charts to create, as (x, y, plot_type) tuples with the same
+      meaning as the arguments of fast_plot.
+    columns: int
+      Number of charts per row.
+    infer_dates: bool
+      As in fast_plot.
+    transport: str
+      As in fast_plot; charts with the same data share a single file.
+    data_dir: str
+      Directory the data files are written to.
+    data_url: str
+      Base URL under which data_dir is served, data_dir itself by default.
+    max_points: int
+      As in fast_plot, for each chart.
+
+    Returns
+    -------
+    altair.vegalite.v3.api.ConcatChart
+      The charts created, concatenated.
+
+    Examples
+    --------
+    >>> fast_plots(df, [("col_date", "col_int", "line"),
+    >>>                 ("col_date", "col_flt", "line")], columns=2)
+
+    """
+
+    # ASSERT TESTS
+    assert isinstance(df, pd.DataFrame), "Data must be in pandas Data Frame!"
+    assert isinstance(specs, list) and len(specs) > 0, \
+        "specs must be a non-empty list of (x, y, plot_type) tuples!"
+    assert all(isinstance(spec, tuple) and len(spec) == 3
+               for spec in specs), \
+        "specs must be a non-empty list of (x, y, plot_type) tuples!"
+    assert isinstance(columns, int) and columns >= 1, \
+        "columns must be a positive integer!"
+    assert transport in {"inline", "json", "csv"}, \
+        'transport must be either: "inline", "json" or "csv"'
+    assert max_points is None or (
+        isinstance(max_points, int) and max_points >= 3), \
+        "max_points must be None or an integer of at least 3!"
+
+    # every chart is validated before any data file is written
+    classified = dict()
+    encodings = list()
+    for x, y, plot_type in specs:
+        (x_type, x_date), (y_type, y_date) = _check_plot_spec(
+            df, x, y, plot_type, infer_dates, classified)
+        encodings.append((x, y, x_date, y_date) + _plot_encoding(
+            x, y, plot_type, x_type, y_type, x_date, y_date))
+
+    import altair as alt
+
+    # the types are spelled out as in fast_plot with file transport, so that
+    # every chart is the same whichever way its data is sent
+    charts = list()
+    for x, y, x_date, y_date, mark, x_arg, y_arg in encodings:
+        data = _plot_data(df, x, y, x_arg, y_arg, max_points)
+        x_arg = _typed_shorthand(x_arg, data[x], x_date)
+        y_arg = _typed_shorthand(y_arg, data[y], y_date)
+        if transport != "inline":
+            data = _write_plot_data(data, transport, data_dir, data_url)
+        charts.append(alt.Chart(data, mark=mark).encode(
+            x=alt.X(x_arg),
+            y=alt.Y(y_arg)
+        ).properties(width=900, height=600))
+    return alt.concat(*charts, columns=columns)
+
+
+def _check_plot_spec(df, x, y, plot_type, infer_dates, columns):
+    """
+    Validates the x, y and plot_type of a chart and returns the dtype of the
+    x and y columns along with whether they hold dates, looking each column
+    up in and recording it into the columns cache so that the charts of a
+    batch classify every column once.
+    """
     # check that x and y are strings, and are valid columns
     assert isinstance(x, str), "x column name must be a string!"
     assert isinstance(y, str), "y column name must be a string!"
@@ -178,63 +1112,67 @@ def fast_plot(df, x, y, plot_type):
         "y column name is not a column in data frame entered!"
 
     # check that plot_type is one of the three allowed
-    assert plot_type.lower() in {"scatter", "line",
-                                 "bar"}, \
+    assert isinstance(plot_type, str) and plot_type.lower() in {
+        "scatter", "line", "bar"}, \
         'plot_type must be either: "scatter", "line",  or "bar"'
 
-    # check that column is not all nulls
-    assert df[x].isnull().sum() != len(df[x]), "x Column must not be all Null!"
-    assert df[y].isnull().sum() != len(df[y]), "y Column must not be all Null!"
+    info = []
+    for col, axis in [(x, "x"), (y, "y")]:
+        if col not in columns:
+            series = df[col]
+            columns[col] = (series.isnull().all(), series.dtype,
+                            _is_date(series, infer_dates))
+        all_null, dtype, date = columns[col]
+        # check that column is not all nulls
+        assert not all_null, axis + " Column must not be all Null!"
+        info.append((dtype, date))
+    return info
 
-    # get types of each column
-    x_type = df[x].dtype
-    y_type = df[y].dtype
 
+def _plot_encoding(x, y, plot_type, x_type, y_type, x_date, y_date):
+    """
+    Returns the mark and the x and y encoding shorthands of a chart.
+    """
     # set x to be ordinal if x column is integer or date
-    if x_type == 'int64' or all(df[x].map(type) == pd.Timestamp):
+    if pd.api.types.is_integer_dtype(x_type) or x_date:
         x_arg = x + ":O"
     else:
         x_arg = x
 
     if plot_type.lower() == "scatter":
         # don't allow y to be date
-        if all(df[y].map(type) == pd.Timestamp):
+        if y_date:
             raise Exception("Y column cannot be a date type!")
-        chart = alt.Chart(df).mark_point().encode(
-            x=alt.X(x_arg),
-            y=alt.Y(y))
+        y_arg = y
+        mark = "point"
 
     elif plot_type.lower() == "line":
         # don't allow y to be date
-        if all(df[y].map(type) == pd.Timestamp):
+        if y_date:
             raise Exception("Y column cannot be a date type!")
 
-        if y_type not in ["float64", "int64"]:
-            if x_type not in ["float64", "int64"]:
+        if not _is_numeric(y_type):
+            if not _is_numeric(x_type):
                 x_arg = x
                 y_arg = y
         else:
             x_arg = x + ":N"
             y_arg = "sum(" + y + ")"
-
-        chart = alt.Chart(df).mark_line().encode(
-            x=alt.X(x_arg),
-            y=alt.Y(y_arg))
+        mark = "line"
 
     # bar chart takes sum of y column,
     # unless y column is non-numeric (then takes sum of x column)
     else:
         # check if column is non numeric
-        if y_type not in ["float64", "int64"]:
+        if not _is_numeric(y_type):
             # raise error if both columns are non numeric
-            if x_type == y_type or (x_type == "O" and all(
-                    df[y].map(type) == pd.Timestamp)) or (
-                    y_type == "O" and all(df[x].map(type) == pd.Timestamp)):
+            if x_type == y_type or (x_type == "O" and y_date) or (
+                    y_type == "O" and x_date):
                 raise Exception(
                     "Bar charts should have a numeric column, "
                     "and both X and Y are non numeric!")
 
-            if all(df[y].map(type) == pd.Timestamp):
+            if y_date:
                 x_arg = "sum(" + x + ")"
                 y_arg = y + ":O"
             else:
@@ -243,15 +1181,152 @@ def fast_plot(df, x, y, plot_type):
         else:
             x_arg = x + ":N"
             y_arg = "sum(" + y + ")"
+        mark = "bar"
 
-        chart = alt.Chart(df).mark_bar().encode(
-            x=alt.X(x_arg),
-            y=alt.Y(y_arg))
+    return mark, x_arg, y_arg
 
-    return chart.properties(width=900, height=600)
+
+def _typed_shorthand(shorthand, series, date):
+    """
+    Appends the Vega-Lite type to an encoding shorthand that has none:
+    quantitative for sums and numeric columns, temporal for dates and
+    nominal otherwise.
+    """
+    if ":" in shorthand:
+        return shorthand
+    if shorthand.startswith("sum(") or _is_numeric(series.dtype):
+        return shorthand + ":Q"
+    return shorthand + (":T" if date else ":N")
+
+
+def _write_plot_data(data, transport, data_dir, data_url):
+    """
+    Writes the data of a chart to a JSON or CSV file named after a hash of
+    its content, unless that file already exists, and returns the URL data
+    referencing it.
+    """
+    digest = hashlib.sha1(str(list(data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy())
+    filename = "pyedahelper-" + digest.hexdigest()[:20] + "." + transport
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, filename)
+    if not os.path.exists(path):
+        if transport == "json":
+            data.to_json(path, orient="records", date_format="iso")
+        else:
+            data.to_csv(path, index=False)
+    import altair as alt
+    url = (data_url if data_url is not None else data_dir).rstrip("/")
+    return alt.UrlData(url=url + "/" + filename,
+                       format=alt.DataFormat(type=transport))
+
+
+def _is_date(series, infer_dates=False, sample_size=1000):
+    """
+    Whether a column holds dates: datetime64 columns always do, and with
+    infer_dates so do object columns whose values are all timestamps,
+    checked on the non-missing values of an evenly spaced sample of at most
+    sample_size rows instead of the whole column.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return True
+    if not infer_dates or not pd.api.types.is_object_dtype(series.dtype):
+        return False
+    if len(series) == 0:
+        return False
+    sample = series.iloc[np.linspace(0, len(series) - 1, min(
+        sample_size, len(series))).astype(np.intp)].dropna()
+    return len(sample) > 0 and all(isinstance(value, datetime.date)
+                                   for value in sample)
+
+
+def _plot_data(df, x, y, x_arg, y_arg, max_points=None):
+    """
+    Returns the data fast_plot embeds in a chart with the given encodings:
+    only the x and y columns, summed per group when one of the encodings is
+    a sum (the chart's own sum then leaves the values unchanged), and
+    downsampled to max_points rows if given.
+    """
+    if x == y:
+        return df[[x]]
+    # unobserved categories are left out, as the chart leaves them out
+    if y_arg.startswith("sum("):
+        data = df.groupby(x, sort=False, dropna=False,
+                          observed=True)[y].sum().reset_index()
+        return _downsample(data, x, y, max_points)
+    if x_arg.startswith("sum("):
+        data = df.groupby(y, sort=False, dropna=False,
+                          observed=True)[x].sum().reset_index()
+        return _downsample(data, y, x, max_points)
+    return _downsample(df[[x, y]], x, y, max_points)
+
+
+def _downsample(data, x, y, max_points):
+    """
+    Reduces the rows of data to max_points: with the Largest-Triangle-
+    Three-Buckets algorithm on the points (x, y) sorted by x when both
+    columns are numeric or dates, by even sampling otherwise. Summed data
+    has one row per group, which is kept or dropped whole, so the sums
+    shown are unchanged.
+    """
+    if max_points is None or len(data) <= max_points:
+        return data
+    if not all(_is_numeric(dtype) or
+               pd.api.types.is_datetime64_any_dtype(dtype)
+               for dtype in data.dtypes):
+        return data.iloc[np.linspace(0, len(data) - 1, max_points).astype(
+            np.intp)]
+    # missing points are not drawn anyway
+    data = data.dropna()
+    if len(data) <= max_points:
+        return data
+    x_values, y_values = _as_float(data[x]), _as_float(data[y])
+    order = np.argsort(x_values, kind="mergesort")
+    picked = _lttb(x_values[order], y_values[order], max_points)
+    return data.iloc[np.sort(order[picked])]
+
+
+def _as_float(series):
+    """
+    Returns a numeric or date column without missing values as a float
+    array, dates as nanoseconds since the epoch.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.astype("int64").to_numpy(dtype=np.float64)
+    return series.to_numpy(dtype=np.float64)
 
 
-def fast_corr(df, col_name):
+def _lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013) of the
+    points (x, y), sorted by x. Keeps the first and last points and, in each
+    of n_out - 2 buckets in between, the point forming the largest triangle
+    with the previously kept point and the average of the next bucket.
+    Returns the positions of the kept points.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    picked = np.empty(n_out, dtype=np.intp)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[stop:edges[i + 2]].mean()
+            next_y = y[stop:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[start:stop] - y[a]) -
+                      (x[a] - x[start:stop]) * (next_y - y[a]))
+        a = start + np.argmax(area)
+        picked[i + 1] = a
+    return picked
+
+
+def fast_corr(df, col_name, save_path=None, method="pearson", n_jobs=None,
+              stats=None):
     """
     The function takes in a dataframe/tibble and a vector of column names and
     creates correlation matrix.The correlation matrix can only include numeric
@@ -259,10 +1334,22 @@ def fast_corr(df, col_name):
 
     Parameters
     -----------------------
-    df: pandas.core.frame.DataFrame
+    df: pandas.core.frame.DataFrame, pyarrow.Table or polars.DataFrame
       The input data frame
     col_name: list
       The names of the columns selected for correlation analysis
+    save_path: str
+      If given, the plot is drawn on a figure of its own with the Agg
+      backend, independently of pyplot, saved to this path and released
+      with the returned Axes, so repeated calls in a long-running process
+      do not accumulate open figures.
+    method: str
+      The correlation coefficient, as in fast_corr_matrix.
+    n_jobs: int
+      Number of worker processes for the Kendall correlation, as in
+      fast_corr_matrix.
+    stats: Profile
+      Statistics of df computed by profile(), as in fast_corr_matrix.
 
     Returns
     ------------------------
@@ -278,6 +1365,202 @@ def fast_corr(df, col_name):
 
     """
 
+    df = _columnar_frame(df)[0]
+    stages = _stages("fast_corr", df)
+    data = _select_corr_columns(df, col_name, method)
+    n_jobs = _check_n_jobs(n_jobs)
+    data2 = data._get_numeric_data()
+    rm_n = data.shape[1] - data2.shape[1]
+    print("Removed", rm_n, "non-numberical columns from your selected columns")
+    stages.done("validation", cols=data.shape[1])
+
+    corr = _stats_corr(stats, df, data2, method, n_jobs)
+    stages.done("correlation", cols=data2.shape[1])
+
+    import seaborn as sns
+    sns.set(style="white")
+    if save_path is None:
+        import matplotlib.pyplot as plt
+        f, ax = plt.subplots(figsize=(9, 11))
+    else:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        f = Figure(figsize=(9, 11))
+        FigureCanvasAgg(f)
+        ax = f.subplots()
+    p = _corr_heatmap(corr, ax)
+    if save_path is not None:
+        f.savefig(save_path)
+    stages.done("render", rows=corr.shape[0], cols=corr.shape[1])
+    return p
+
+
+def fast_corr_matrix(df, col_name, top_k=None, method="pearson",
+                     n_jobs=None, stats=None):
+    """
+    Computes the correlation matrix plotted by fast_corr without plotting
+    it, for pipelines that only need the numbers. Non numeric columns are
+    left out silently.
+
+    Parameters
+    -----------------------
+    df: pandas.core.frame.DataFrame, pyarrow.Table or polars.DataFrame
+      The input data frame. The results of Arrow tables and Polars data
+      frames are returned in the same library, the matrix with the column
+      names in a first "column_name" column.
+    col_name: list
+      The names or indexes of the columns selected for correlation analysis
+    top_k: int
+      If given, only the top_k pairs of distinct columns with the strongest
+      correlation (in absolute value) are returned instead of the matrix.
+    method: str
+      The correlation coefficient, from {"pearson", "spearman", "kendall"}.
+      Pearson correlations are pairwise-complete, as in DataFrame.corr().
+      Spearman correlations are the Pearson correlations of the ranks of
+      every column, computed once for the whole data frame; with missing
+      values they may differ slightly from DataFrame.corr(), which ranks
+      every pair again on the rows where both columns are present. Kendall
+      correlations (tau-b) use the O(n log n) merge sort algorithm of
+      scipy.stats.kendalltau on the rows where both columns are present.
+    n_jobs: int
+      Number of worker processes the pairs of columns of the Kendall
+      correlation are spread over; None runs in the current process and -1
+      uses all the CPUs.
+    stats: Profile
+      Statistics of df computed by profile() with corr=True. The Pearson
+      correlations are then read from it instead of being computed.
+
+    Returns
+    ------------------------
+    pandas.core.frame.DataFrame
+        The correlation matrix, or with top_k a data frame of the pairs with
+        columns "column_1", "column_2" and "corr", strongest first.
+
+    Examples
+    ------------------------
+    >>> fast_corr_matrix(iris, ['sepal_length', 'sepal_width',
+    >>>                         'petal_length', 'petal_width'], top_k=3)
+
+    """
+
+    df, library = _columnar_frame(df)
+    stages = _stages("fast_corr_matrix", df)
+    data = _select_corr_columns(df, col_name, method)
+    if top_k is not None and (not isinstance(top_k, int) or top_k < 1):
+        raise ValueError("The top_k must be a positive integer.")
+    n_jobs = _check_n_jobs(n_jobs)
+    stages.done("validation", cols=data.shape[1])
+
+    corr = _stats_corr(stats, df, data._get_numeric_data(), method, n_jobs)
+    stages.done("correlation", cols=corr.shape[1])
+    if top_k is None:
+        if library is not None:
+            # Arrow tables have no index: the column names come first
+            return _to_columnar(
+                corr.rename_axis("column_name").reset_index(), library)
+        return corr
+
+    # the strongest pairs of the upper triangle, NaN pairs last
+    rows, cols = np.triu_indices(corr.shape[0], k=1)
+    strength = np.nan_to_num(np.abs(corr.to_numpy()[rows, cols]), nan=-1)
+    if top_k < len(strength):
+        keep = np.argpartition(-strength, top_k - 1)[:top_k]
+    else:
+        keep = np.arange(len(strength))
+    keep = keep[np.argsort(-strength[keep], kind="stable")]
+    rows, cols = rows[keep], cols[keep]
+    pairs = pd.DataFrame({"column_1": corr.columns[rows],
+                          "column_2": corr.columns[cols],
+                          "corr": corr.to_numpy()[rows, cols]})
+    if library is not None:
+        pairs = _to_columnar(pairs, library)
+    stages.done("top pairs", rows=len(strength), cols=3)
+    return pairs
+
+
+def fast_corr_chunked(chunks, col_name):
+    """
+    Streaming version of the correlation computed by fast_corr, for data that
+    does not fit in memory. The chunks are read once and only the sufficient
+    statistics of the correlation are kept, so memory use is bounded by the
+    chunk size and the number of columns rather than by the number of rows.
+
+    Parameters
+    -----------------------
+    chunks: callable or iterable
+      Either a function returning an iterable of data frames, such as
+      ``lambda: pd.read_csv(path, chunksize=10 ** 6)``, or an iterable of
+      data frames.
+    col_name: list
+      The names of the columns selected for correlation analysis. Non
+      numeric columns are left out.
+
+    Returns
+    ------------------------
+    pandas.core.frame.DataFrame
+        The pairwise-complete Pearson correlation matrix of the numeric
+        columns.
+
+    Examples
+    ------------------------
+    >>> fast_corr_chunked(
+    >>>     lambda: pd.read_csv("data.csv", chunksize=100000),
+    >>>     ['sepal_length', 'sepal_width', 'petal_length'])
+
+    """
+
+    if not isinstance(col_name, list):
+        raise TypeError("The col_name must be list.")
+
+    if all(isinstance(item, str) for item in col_name) is False:
+        raise ValueError("The col_name must be a list of strings.")
+
+    if len(col_name) < 2:
+        raise ValueError(
+            "At least two columns must be selected for correlation analysis.")
+
+    stats = None
+    for chunk in _iter_chunks(chunks):
+        if not isinstance(chunk, pd.DataFrame):
+            raise TypeError("The type of the chunks must be dataframe.")
+        if stats is None:
+            if all(elem in chunk.columns.to_list()
+                   for elem in col_name) is False:
+                raise ValueError("The column names were not found.")
+            cols = chunk.loc[:, col_name]._get_numeric_data().columns
+            stats = _CorrStats(len(cols))
+        stats.update(chunk[cols].to_numpy(dtype=np.float64,
+                                          na_value=np.nan))
+    if stats is None:
+        raise ValueError("The chunks must contain at least one dataframe.")
+    return pd.DataFrame(stats.corr(), index=cols, columns=cols)
+
+
+def _stats_corr(stats, df, data, method, n_jobs):
+    """
+    Correlation matrix of the numeric columns data of df, read from the
+    statistics computed by profile() when given.
+    """
+    if stats is None:
+        return _corr_frame(data, method, n_jobs)
+    _check_stats(stats, df, data.columns)
+    if method != "pearson" or stats.corr is None or not data.columns.isin(
+            stats.corr.columns).all():
+        raise ValueError("The stats only hold the Pearson correlations of "
+                         "the non boolean numeric columns, when computed by "
+                         "profile(corr=True).")
+    return stats.corr.loc[data.columns, data.columns]
+
+
+def _select_corr_columns(df, col_name, method="pearson"):
+    """
+    Validates the arguments of the correlation functions and returns the
+    selected columns of the data frame.
+    """
+    if method not in {"pearson", "spearman", "kendall"}:
+        raise ValueError(
+            "The method must be one of 'pearson', 'spearman' or 'kendall'.")
+
     if not isinstance(df, pd.DataFrame):
         raise TypeError("The type of the input data must be dataframe.")
 
@@ -305,27 +1588,158 @@ def fast_corr(df, col_name):
         data = df.loc[:, col_name]
     else:
         data = df.iloc[:, col_name]
+    return data
 
-    data2 = data._get_numeric_data()
-    rm_n = data.shape[1] - data2.shape[1]
-    print("Removed", rm_n, "non-numberical columns from your selected columns")
 
-    sns.set(style="white")
-    corr = data2.corr()
-    mask = np.triu(np.ones_like(corr, dtype=np.bool))
-    f, ax = plt.subplots(figsize=(9, 11))
+def _corr_heatmap(corr, ax):
+    """
+    Draws the lower triangle of a correlation matrix as a heatmap on ax.
+    """
+    import seaborn as sns
+    mask = np.triu(np.ones_like(corr, dtype=bool))
     ax.set_title('Correlation Matrix', size=20)
     ax.tick_params(axis='x', labelsize=15)
     ax.tick_params(axis='y', labelsize=15)
 
     cmap = sns.diverging_palette(220, 20, as_cmap=True)
     p = sns.heatmap(corr, mask=mask, cmap=cmap, vmin=-1, vmax=1, center=0,
-                    square=True, linewidths=.5, cbar_kws={"shrink": .5})
+                    square=True, linewidths=.5, cbar_kws={"shrink": .5},
+                    ax=ax)
     p.set_yticklabels(p.get_yticklabels(), rotation=360)
     return p
 
 
-def fast_missing_impute(df, method, cols):
+def _corr_frame(data, method="pearson", n_jobs=1, block_rows=2 ** 16):
+    """
+    Correlation matrix of the columns of a numeric data frame. Pearson and
+    Spearman correlations are accumulated by _CorrStats over blocks of
+    block_rows rows converted to float64 one at a time, the latter on the
+    ranks of the columns; Kendall correlations are computed pair by pair,
+    spread over n_jobs worker processes.
+    """
+    if method == "kendall":
+        corr = _kendall_matrix(data.to_numpy(dtype=np.float64,
+                                             na_value=np.nan), n_jobs)
+    else:
+        if method == "spearman":
+            data = pd.DataFrame(data.to_numpy(
+                dtype=np.float64, na_value=np.nan), columns=data.columns,
+                index=data.index).rank()
+        stats = _CorrStats(data.shape[1])
+        for start in range(0, max(len(data), 1), block_rows):
+            stats.update(data.iloc[start:start + block_rows].to_numpy(
+                dtype=np.float64, na_value=np.nan))
+        corr = stats.corr()
+    return pd.DataFrame(corr, index=data.columns, columns=data.columns)
+
+
+def _kendall_matrix(block, n_jobs=1):
+    """
+    Kendall tau-b correlation matrix of the columns of a 2-D float array,
+    with the pairs of columns split evenly between n_jobs worker processes.
+    The diagonal is 1 for columns with values, as in DataFrame.corr().
+    """
+    n_cols = block.shape[1]
+    rows, cols = np.triu_indices(n_cols, k=1)
+    n_jobs = max(min(n_jobs, len(rows)), 1)
+    shards = np.array_split(np.arange(len(rows)), n_jobs)
+    if n_jobs == 1:
+        taus = _kendall_pairs(block, rows, cols)
+    else:
+        # every worker gets the whole block: pickling it costs O(n) per job
+        # against O(n log n) per pair for the correlations
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(_kendall_pairs, block, rows[shard],
+                                   cols[shard]) for shard in shards]
+            taus = np.concatenate([future.result() for future in futures])
+    corr = np.empty((n_cols, n_cols))
+    corr[rows, cols] = corr[cols, rows] = taus
+    np.fill_diagonal(corr, np.where((~np.isnan(block)).any(axis=0),
+                                    1.0, np.nan))
+    return corr
+
+
+def _kendall_pairs(block, rows, cols):
+    """
+    Kendall tau-b correlations of the pairs of columns (rows[k], cols[k]) of
+    a 2-D float array, on the rows where both are present.
+    """
+    from scipy.stats import kendalltau
+    valid = ~np.isnan(block)
+    taus = np.full(len(rows), np.nan)
+    for k, (i, j) in enumerate(zip(rows, cols)):
+        both = valid[:, i] & valid[:, j]
+        if both.sum() > 1:
+            taus[k] = kendalltau(block[both, i], block[both, j])[0]
+    return taus
+
+
+class _CorrStats:
+    """
+    Sufficient statistics of the pairwise-complete Pearson correlation of the
+    columns of 2-D float arrays added block by block. For every pair of
+    columns they hold the number of rows where both are present and the sums
+    of x, x ** 2 and x * y over those rows, all obtained from matrix products
+    of the data and its validity mask, so the whole matrix costs a few BLAS
+    calls per block instead of one pass over the rows per pair. The data is
+    shifted by the column means of the first block to avoid the cancellation
+    of the sums of squares.
+    """
+
+    def __init__(self, n_cols):
+        self.shift = None
+        self.n = np.zeros((n_cols, n_cols))
+        self.sx = np.zeros((n_cols, n_cols))
+        self.sxx = np.zeros((n_cols, n_cols))
+        self.sxy = np.zeros((n_cols, n_cols))
+
+    def update(self, block):
+        """
+        Adds the rows of a 2-D float array, ignoring NaN entries.
+        """
+        if self.shift is None:
+            present = ~np.isnan(block)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.shift = np.where(
+                    present.any(axis=0),
+                    np.where(present, block, 0).sum(axis=0)
+                    / present.sum(axis=0), 0)
+        block = block - self.shift
+        valid = ~np.isnan(block)
+        if valid.all():
+            # without missing values every pair sees every row
+            self.n += len(block)
+            self.sx += block.sum(axis=0)[:, None]
+            self.sxx += (block ** 2).sum(axis=0)[:, None]
+        else:
+            block = np.where(valid, block, 0)
+            mask = valid.astype(np.float64)
+            self.n += mask.T @ mask
+            self.sx += block.T @ mask
+            self.sxx += (block ** 2).T @ mask
+        self.sxy += block.T @ block
+
+    def corr(self):
+        """
+        Correlation matrix, NaN for pairs with less than two rows in common
+        or where a column is constant.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = self.sxy - self.sx * self.sx.T / self.n
+            var = self.sxx - self.sx ** 2 / self.n
+            # relative to the sums of squares, so that rounding errors left
+            # by constant columns do not count as variance
+            defined = (var > 1e-12 * self.sxx) & (var.T > 1e-12 * self.sxx.T)
+            corr = np.where(defined, cov / np.sqrt(
+                np.where(defined, var * var.T, 1)), np.nan)
+        corr = np.clip(corr, -1, 1)
+        np.fill_diagonal(corr, np.where(np.diag(defined), 1.0, np.nan))
+        return corr
+
+
+def fast_missing_impute(df, method, cols, quantile_engine="exact",
+                        quantile_error=0.01, n_jobs=None, inplace=False,
+                        return_mask=False, by=None, stats=None):
     """
     The function takes in a dataframe, a method of imputation, and a list of
     column names to modify. The choices of imputation are either remove
@@ -336,17 +1750,51 @@ def fast_missing_impute(df, method, cols):
 
     Arguments
     -----------------------
-    df: pandas dataframe
-        The dataframe of interest
+    df: pandas dataframe, pyarrow.Table or polars.DataFrame
+        The dataframe of interest. Arrow tables and Polars data frames are
+        read without converting them to pandas and are filled natively;
+        the result, or the mask of method = "remove", is in the same
+        library and shares the columns that are not imputed. Integer
+        columns filled with a fractional value become float64
     method: str
         The method of imputation from: {remove, mean, median, mode}
     cols: lst
         The names of columns with missing data to be modified
+    quantile_engine: str
+        How the median is computed: "exact", or "sketch" for an approximate
+        median in linear time and bounded memory
+    quantile_error: flt
+        Approximate rank error of the median when quantile_engine="sketch"
+    n_jobs: int
+        Number of worker processes the columns' statistics are computed
+        with. None or 1 runs serially, -1 uses every CPU
+    inplace: bool
+        Whether to modify df itself instead of returning a new dataframe.
+        Only the buffers of the imputed columns are replaced, the rest of
+        the dataframe is never copied. Not available for Arrow tables and
+        Polars data frames, which are immutable
+    return_mask: bool
+        With method = "remove", return the boolean mask of the rows to keep
+        instead of a filtered copy of the dataframe
+    by: str or lst
+        Column name(s) to group the rows by. Each missing value is then
+        filled with the statistic of its own group, computed for all groups
+        in a single groupby pass. Rows whose group has no statistic (all of
+        its values, or its key, missing) are left missing. Only the exact
+        median is available and n_jobs does not apply
+    stats: Profile
+        Statistics of df computed by profile(), from which the means,
+        medians and modes are then taken instead of being computed. It
+        cannot be combined with by
 
     Returns
     ------------------------
     new_df
-        A new dataframe with the missing values imputed
+        A new dataframe with the missing values imputed, None when inplace
+        is True, or a boolean Series when return_mask is True. Unless
+        pandas' copy-on-write mode is enabled the new dataframe is a full
+        copy of df; with copy-on-write the columns that are not imputed are
+        shared with df until either of them is modified
 
     Examples
     ------------------------
@@ -362,6 +1810,278 @@ def fast_missing_impute(df, method, cols):
     >>> fast_missing_impute(df = sample_data, method = "mode",
     >>>                        cols = ["col_a", "col_b"])
 
+    >>> fast_missing_impute(df = sample_data, method = "median",
+    >>>                        cols = ["col_a"], by = "col_b")
+
+    """
+    columnar = df
+    df, library = _columnar_frame(df)
+    stages = _stages("fast_missing_impute", df)
+    _check_impute_args(df, method, cols, quantile_engine, quantile_error)
+    n_jobs = _check_n_jobs(n_jobs)
+    if by is not None:
+        by = [by] if isinstance(by, str) else by
+        assert isinstance(by, list), "by must be a column name or a list!"
+        for col in by:
+            assert col in df.columns, \
+                "One or more of the by columns are not in the data frame!"
+            assert col not in cols, "by columns cannot be imputed!"
+        assert quantile_engine == "exact", \
+            "Grouped imputation only supports quantile_engine = 'exact'"
+        assert stats is None, "stats cannot be used with by"
+    if stats is not None:
+        _check_stats(stats, df, cols)
+
+    assert isinstance(inplace, bool), "inplace must be True or False!"
+    assert library is None or not inplace, \
+        "Arrow tables and Polars data frames cannot be imputed inplace!"
+    assert not return_mask or method == "remove", \
+        "return_mask can only be used with method = 'remove'"
+    stages.done("validation")
+
+    if method == "remove":
+        if library is not None:
+            keep = df[cols].notna().all(axis=1).to_numpy()
+            stages.done("missing mask", cols=len(cols))
+            rows = _columnar_rows(columnar, library, keep, return_mask)
+            stages.done("remove", cols=len(cols))
+            return rows
+        if return_mask:
+            mask = df[cols].notna().all(axis=1)
+            stages.done("missing mask", cols=len(cols))
+            return mask
+        if inplace:
+            df.dropna(subset=cols, inplace=True)
+            stages.done("remove", cols=len(cols))
+            return None
+        new_df = df.dropna(subset=cols)
+        stages.done("remove", cols=len(cols))
+        return new_df
+
+    if stats is None and by is None and _stats_cache is not None:
+        stats = _cached_profile(df, cols, quantile_engine, quantile_error,
+                                method == "median")
+    if inplace:
+        _uncache_columns(df, cols)
+    # Arrow and Polars inputs are filled natively, from their pandas view
+    new_df = _impute_target(df, inplace) if library is None else df
+    if stats is not None:
+        fill_values = {col: stats._fill_value(df[col], method)
+                       for col in cols}
+    elif by is None:
+        fill_values = _compute_fill_values(new_df, cols, method,
+                                           quantile_engine, quantile_error,
+                                           n_jobs)
+    else:
+        fill_values = _group_fill_values(new_df, cols, method, by)
+    stages.done("fill values", cols=len(cols))
+    if library is not None:
+        new_df = _columnar_fill(columnar, library, df, fill_values)
+        stages.done("fill", cols=len(cols))
+        return new_df
+    _apply_fill_values(new_df, fill_values, inplace)
+    stages.done("fill", cols=len(cols))
+
+    return None if inplace else new_df
+
+
+class Imputer:
+    """
+    Imputes missing values like fast_missing_impute, but with the fill
+    values computed once by fit on a reference dataframe. transform then
+    applies them to any number of new batches in time proportional to the
+    batch, and the fitted statistics can be saved to and loaded from a JSON
+    file.
+
+    Parameters
+    -----------------------
+    method: str
+        The method of imputation from: {remove, mean, median, mode}
+    cols: lst
+        The names of columns with missing data to be modified
+    quantile_engine: str
+        How the median is computed, see fast_missing_impute
+    quantile_error: flt
+        Approximate rank error of the median when quantile_engine="sketch"
+    n_jobs: int
+        Number of worker processes the statistics are computed with
+
+    Attributes
+    -----------------------
+    fill_values_: dict
+        The value each column is filled with, None before fit (and for the
+        remove method, which has no statistics)
+
+    Examples
+    ------------------------
+    >>> imputer = Imputer(method="median", cols=["col_a", "col_c"])
+    >>> imputer.fit(reference_data)
+    >>> imputer.save("imputer.json")
+    >>> Imputer.load("imputer.json").transform(new_batch)
+
+    """
+
+    def __init__(self, method, cols, quantile_engine="exact",
+                 quantile_error=0.01, n_jobs=None):
+        self.method = method
+        self.cols = cols
+        self.quantile_engine = quantile_engine
+        self.quantile_error = quantile_error
+        self.n_jobs = n_jobs
+        self.fill_values_ = None
+        self._fitted = False
+
+    def fit(self, df):
+        """
+        Computes the fill values of the columns from df.
+
+        Arguments
+        -----------------------
+        df: pandas dataframe
+            The reference dataframe
+
+        Returns
+        ------------------------
+        Imputer
+            The fitted imputer
+        """
+        _check_impute_args(df, self.method, self.cols, self.quantile_engine,
+                           self.quantile_error)
+        if self.method != "remove":
+            self.fill_values_ = _compute_fill_values(
+                df, self.cols, self.method, self.quantile_engine,
+                self.quantile_error, _check_n_jobs(self.n_jobs))
+        self._fitted = True
+        return self
+
+    def transform(self, df, inplace=False):
+        """
+        Imputes the missing values of df with the fitted fill values.
+
+        Arguments
+        -----------------------
+        df: pandas dataframe
+            The dataframe to impute
+        inplace: bool
+            Whether to modify df itself, see fast_missing_impute
+
+        Returns
+        ------------------------
+        new_df
+            A new dataframe with the missing values imputed, or None when
+            inplace is True
+        """
+        assert self._fitted, "The imputer must be fitted first!"
+        _check_impute_args(df, self.method, self.cols, self.quantile_engine,
+                           self.quantile_error)
+        assert isinstance(inplace, bool), "inplace must be True or False!"
+
+        if self.method == "remove":
+            if inplace:
+                df.dropna(subset=self.cols, inplace=True)
+                return None
+            return df.dropna(subset=self.cols)
+
+        new_df = _impute_target(df, inplace)
+        _apply_fill_values(new_df, self.fill_values_, inplace)
+        return None if inplace else new_df
+
+    def fit_transform(self, df):
+        """
+        Fits the imputer on df and returns df imputed.
+        """
+        return self.fit(df).transform(df)
+
+    def save(self, path):
+        """
+        Writes the parameters and fitted fill values to a JSON file. Each
+        fill value is saved with its type, so that load rebuilds it as it
+        was fitted (a datetime64 mode as a datetime64, not as an integer).
+        """
+        assert self._fitted, "The imputer must be fitted first!"
+        fill_values = self.fill_values_
+        if fill_values is not None:
+            fill_values = {col: _encode_fill_value(value)
+                           for col, value in fill_values.items()}
+        state = {"method": self.method, "cols": self.cols,
+                 "quantile_engine": self.quantile_engine,
+                 "quantile_error": self.quantile_error,
+                 "fill_values": fill_values}
+        with open(path, "w") as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Creates a fitted imputer from a JSON file written by save.
+        """
+        with open(path) as f:
+            state = json.load(f)
+        imputer = cls(state["method"], state["cols"],
+                      state["quantile_engine"], state["quantile_error"])
+        if state["fill_values"] is not None:
+            imputer.fill_values_ = {
+                col: _decode_fill_value(value)
+                for col, value in state["fill_values"].items()}
+        imputer._fitted = True
+        return imputer
+
+
+def _encode_fill_value(value):
+    """
+    Converts a fill value to a JSON object holding the value and the name
+    of its type, with dates, times and decimals written as strings, for
+    _decode_fill_value to rebuild it from.
+    """
+    if isinstance(value, np.generic):
+        if value.dtype.kind == "M":
+            encoded = np.datetime_as_string(value)
+        elif value.dtype.kind == "m":
+            encoded = int(value.astype(np.int64))
+        else:
+            encoded = value.item()
+        return {"type": "numpy." + value.dtype.name, "value": encoded}
+    if isinstance(value, pd.Timestamp):
+        # pytz zones have a zone and zoneinfo ones a key; other time zones
+        # are kept as the UTC offset of the ISO string
+        tz = getattr(value.tz, "zone", None) or getattr(value.tz, "key", None)
+        return {"type": "Timestamp", "value": value.isoformat(), "tz": tz}
+    if isinstance(value, pd.Timedelta):
+        return {"type": "Timedelta", "value": value.isoformat()}
+    if isinstance(value, (datetime.date, datetime.time)):
+        return {"type": type(value).__name__, "value": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"type": "Decimal", "value": str(value)}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return {"type": type(value).__name__, "value": value}
+    raise TypeError("Cannot save fill value " + repr(value) + " as JSON")
+
+
+def _decode_fill_value(state):
+    """
+    Rebuilds a fill value written by _encode_fill_value. Values saved by
+    earlier versions, without their type, are returned as they are.
+    """
+    if not isinstance(state, dict):
+        return state
+    kind, value = state["type"], state["value"]
+    if kind == "Timestamp":
+        value = pd.Timestamp(value)
+        return value.tz_convert(state["tz"]) if state["tz"] else value
+    if kind == "Timedelta":
+        return pd.Timedelta(value)
+    if kind in ["datetime", "date", "time"]:
+        return getattr(datetime, kind).fromisoformat(value)
+    if kind == "Decimal":
+        return decimal.Decimal(value)
+    if kind.startswith("numpy."):
+        return np.array(value).astype(kind[len("numpy."):])[()]
+    return value
+
+
+def _check_impute_args(df, method, cols, quantile_engine, quantile_error):
+    """
+    Validates the arguments shared by fast_missing_impute and Imputer.
     """
     assert isinstance(df, pd.DataFrame), "Data must be a data frame!"
 
@@ -375,30 +2095,849 @@ def fast_missing_impute(df, method, cols):
                                "can only use " \
                                "method = remove, mean, median, or mode!"
 
+    _check_quantile_args(quantile_engine, quantile_error)
+
     for col in cols:
         assert isinstance(col, str), "Columns must be a list of strings"
         assert col in df.columns, \
             "One or more of the column names are not in the data frame!"
-        if df[col].dtype != 'int64' and df[col].dtype != 'float64':
+        if not _is_numeric(df[col].dtype):
             assert method in ["remove",
                               "mode"], "With non-numeric columns, " \
                                        "can only use " \
                                        "method = 'remove' or 'mode'"
-    new_df = df.copy()
-    if method == "remove":
-        new_df = new_df.dropna(subset=cols)
 
-    elif method == "mean":
+
+def _impute_target(df, inplace):
+    """
+    Returns the dataframe the imputed columns are written to: df itself
+    when inplace, a shallow copy under pandas' copy-on-write mode (the
+    untouched columns are then shared until modified) and a full copy
+    otherwise.
+    """
+    if inplace:
+        return df
+    if getattr(pd.options.mode, "copy_on_write", False):
+        return df.copy(deep=False)
+    return df.copy()
+
+
+def _compute_fill_values(df, cols, method, quantile_engine, quantile_error,
+                         n_jobs):
+    """
+    Computes the values the columns cols of df are filled with, as a
+    dictionary keyed by column name.
+    """
+    if n_jobs <= 1:
+        # column by column, without selecting the columns into a new frame
+        return _fill_values(df, method, quantile_engine, quantile_error,
+                            cols)
+    num_cols = [col for col in cols if _is_numeric(df[col].dtype)]
+    other_cols = [col for col in cols if col not in num_cols]
+    fill_values = dict()
+    for shard_cols in _dtype_groups(df, num_cols) + [other_cols]:
+        if len(shard_cols) > 0:
+            for shard in _map_column_shards(
+                    _fill_values, df[shard_cols], n_jobs, method,
+                    quantile_engine, quantile_error):
+                fill_values.update(shard)
+    return {col: fill_values[col] for col in cols}
+
+
+def _group_fill_values(df, cols, method, by):
+    """
+    Computes, for each column of cols, an array holding for every row the
+    statistic of the row's group, with the groups defined by the columns by.
+    Means and medians come from a single groupby aggregation broadcast back
+    to the rows; modes from one sort of the (group, value) code pairs.
+    """
+    grouped = df.groupby(by, sort=False)
+    fill_values = dict()
+    if method in ["mean", "median"]:
+        stats = grouped[cols].transform(method)
         for col in cols:
-            new_df[col] = new_df[col].fillna(new_df[col].mean(), inplace=False)
+            fill_values[col] = stats[col].to_numpy(dtype=np.float64,
+                                                   na_value=np.nan)
+        return fill_values
+
+    groups = grouped.ngroup().fillna(-1).to_numpy(dtype=np.intp)
+    for col in cols:
+        modes = _group_modes(df[col], groups, grouped.ngroups)
+        fill_values[col] = modes[groups]
+        fill_values[col][groups < 0] = np.nan
+    return fill_values
+
 
+def _group_modes(series, groups, n_groups):
+    """
+    Returns the most frequent non-missing value of series within each
+    group, as an array indexed by group code (NaN for groups without
+    values). Ties go to the value that appears first in the column, as in
+    _column_mode.
+    """
+    codes, uniques = _factorize(series)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # categories are ranked by their first position, as factorize
+        # ranks the values of other columns
+        present = codes >= 0
+        rank = np.full(len(uniques), len(codes))
+        np.minimum.at(rank, codes[present], np.flatnonzero(present))
+    else:
+        rank = np.arange(len(uniques))
+    valid = (codes >= 0) & (groups >= 0)
+    pairs, counts = np.unique(
+        groups[valid].astype(np.int64) * len(uniques) + codes[valid],
+        return_counts=True)
+    pair_groups, pair_codes = np.divmod(pairs, max(len(uniques), 1))
+    # within each group: highest count first, then first appearance
+    order = np.lexsort((rank[pair_codes], -counts, pair_groups))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = pair_groups[order][1:] != pair_groups[order][:-1]
+    best = order[first]
+    uniques = np.asarray(uniques)
+    modes = np.full(n_groups, np.nan,
+                    dtype=uniques.dtype if uniques.dtype.kind == "f"
+                    else object)
+    modes[pair_groups[best]] = uniques[pair_codes[best]]
+    return modes
+
+
+def _apply_fill_values(df, fill_values, inplace):
+    """
+    Fills the missing values of each column of df named in fill_values,
+    with either a single value or, for grouped imputation, an array holding
+    one fill value per row (missing where the row's group has none). The
+    values are written into the columns' existing buffers, with inplace or
+    when df is the full copy made by _impute_target; under copy-on-write
+    the columns of the shallow copy are replaced by filled copies instead,
+    so the data frame they are shared with is never written to.
+    """
+    in_buffers = inplace or not getattr(pd.options.mode, "copy_on_write",
+                                        False)
+    for col, value in fill_values.items():
+        column = df[col]
+        missing = column.isna().to_numpy()
+        per_row = isinstance(value, np.ndarray)
+        if per_row:
+            missing &= ~pd.isna(value)
+            value = value[missing]
+            if isinstance(column.dtype, np.dtype) and \
+                    column.dtype.kind == "f":
+                # keeps float32 columns from being upcast
+                value = value.astype(column.dtype)
+            elif _is_numeric(column.dtype):
+                value = value.astype(np.float64)
+        if not missing.any():
+            continue
+        if pd.api.types.is_extension_array_dtype(column.dtype) and \
+                pd.api.types.is_integer_dtype(column.dtype) and \
+                np.any(value != np.round(value)):
+            # a fractional mean or median does not fit nullable integers
+            df[col] = column.astype("Float64")
+            df.loc[missing, col] = value
+        elif in_buffers and (inplace or column.dtype != object):
+            # writes into the column's existing buffer; replacing the whole
+            # column would make pandas copy the other columns of its block.
+            # Object columns of a copy still go through fillna, which infers
+            # the type of the filled values (bool, say)
+            df.loc[missing, col] = value
+        elif per_row:
+            filled = column.copy()
+            filled[missing] = value
+            df[col] = filled
+        else:
+            df[col] = column.fillna(value, inplace=False)
+
+
+def _fill_values(frame, method, quantile_engine, quantile_error,
+                 cols=None):
+    """
+    Computes the values that fast_missing_impute fills the columns cols of
+    frame (all of them by default) with, as a dictionary keyed by column
+    name.
+    """
+    cols = list(frame.columns) if cols is None else cols
+    if method == "mean":
+        values = [frame[col].mean() for col in cols]
+    elif method == "median" and quantile_engine == "exact":
+        values = [frame[col].median() for col in cols]
     elif method == "median":
+        # every column is sketched from its own buffer, without gathering
+        # the columns into a block first
+        values = list()
         for col in cols:
-            new_df[col] = new_df[col].fillna(new_df[col].median(),
-                                             inplace=False)
+            sketch = _QuantileSketch(quantile_error)
+            sketch.update(*_column_buffer(frame[col]))
+            values.append(sketch.quantile([0.5])[0])
+    else:
+        values = [_column_mode(frame[col]) for col in cols]
+    return dict(zip(cols, values))
+
+
+def _column_mode(series):
+    """
+    Returns the most frequent non-missing value of a column, NaN if it has
+    none. Ties go to the value that appears first in the column. The
+    values are hashed once by factorize and counted with bincount, instead
+    of being counted one by one in Python.
+    """
+    codes, uniques = _factorize(series)
+    codes = codes[codes >= 0]
+    if len(codes) == 0:
+        return np.nan
+    counts = np.bincount(codes, minlength=len(uniques))
+    tied = np.flatnonzero(counts == counts.max())
+    if len(tied) == 1 or not isinstance(series.dtype, pd.CategoricalDtype):
+        # factorize numbers the values in order of first appearance
+        best = tied[0]
+    else:
+        best = codes[np.argmax(np.isin(codes, tied))]
+    return np.asarray(uniques)[best]
+
+
+def profile(df, cols="All", quantile_engine="exact", quantile_error=0.01,
+            corr=True):
+    """
+    Computes in one go the statistics that fast_outlier_id,
+    fast_missing_impute and fast_corr need: missing value counts of every
+    column, count, mean, standard deviation and quartiles of the numeric
+    columns, value counts of the categorical columns and the correlation
+    matrix of the numeric columns. Every numeric block is converted once and
+    all its statistics are computed from it. Passing the result as the stats
+    argument of those functions saves them from scanning the data again.
+
+    Parameters
+    ----------
+    df: pandas.core.frame.DataFrame
+      The data that will be profiled.
+    cols: list
+      The column names to be profiled, all of them by default.
+    quantile_engine: str
+      How the quartiles are computed, as in fast_outlier_id.
+    quantile_error: flt
+      Approximate rank error of the quartiles when quantile_engine="sketch".
+    corr: bool
+      Whether to compute the Pearson correlation matrix, whose cost grows
+      with the square of the number of numeric columns.
+
+    Returns
+    -------
+    Profile
+      The statistics of the columns, with a summary data frame in its
+      summary attribute.
+
+    Examples
+    --------
+    >>> stats = profile(df)
+    >>> fast_outlier_id(df, method="interquartile", stats=stats)
+    >>> fast_missing_impute(df, "median", ["col_a"], stats=stats)
+    >>> fast_corr_matrix(df, ["col_a", "col_b"], stats=stats)
+
+    """
+    stages = _stages("profile", df)
+    assert isinstance(df, pd.DataFrame), "Data must be in pandas Data Frame!"
+    cols = _check_outlier_args(list(df.columns), cols, "z-score")
+    _check_quantile_args(quantile_engine, quantile_error)
+    assert isinstance(corr, bool), "corr must be True or False!"
+    stages.done("validation")
+
+    stats = _profile_columns(df, cols, quantile_engine, quantile_error,
+                             stages=stages)
+    if corr:
+        num_cols = list(stats.numeric.index)
+        stats.corr = _corr_frame(df[num_cols])
+        stages.done("correlation", cols=len(num_cols))
+    return stats
+
+
+def _profile_columns(df, cols, quantile_engine, quantile_error,
+                     quartiles=True, stages=None):
+    """
+    Computes the statistics of profile() but the correlations, leaving the
+    quartiles of the numeric columns missing unless quartiles is set.
+    """
+    stages = _NO_STAGES if stages is None else stages
+    stats = Profile(len(df), cols, quantile_engine)
+    num_cols = [col for col in cols if _is_numeric(df[col].dtype)]
+    numeric = dict()
+    for group in _dtype_groups(df, num_cols):
+        block, valid = _numeric_block(df[group])
+        count, mean, std = _column_moments(block, valid)
+        if quartiles:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                quantiles = _column_quantiles(
+                    block, valid, [0.25, 0.5, 0.75], quantile_engine,
+                    quantile_error)
+        else:
+            quantiles = np.full((3, len(group)), np.nan)
+        for j, col in enumerate(group):
+            numeric[col] = [count[j], mean[j], std[j]] + list(quantiles[:, j])
+            stats.no_nans[col] = len(df) - count[j]
+        del block, valid
+    stats.numeric = pd.DataFrame.from_dict(
+        numeric, orient="index", columns=_NUMERIC_STATS).reindex(num_cols)
+    stages.done("numeric statistics", cols=len(num_cols))
+
+    for col in cols:
+        if _is_categorical(df[col].dtype):
+            codes, uniques = _factorize(df[col])
+            present = codes >= 0
+            counts = np.bincount(codes[present], minlength=len(uniques))
+            first = np.full(len(uniques), len(codes))
+            np.minimum.at(first, codes[present],
+                          np.flatnonzero(present))
+            stats.categories[col] = (np.asarray(uniques), counts, first)
+            stats.no_nans[col] = len(codes) - present.sum()
+        elif col not in stats.no_nans:
+            stats.no_nans[col] = df[col].isna().sum()
+    stages.done("categorical counts")
+    return stats
+
+
+# Statistics of the numeric columns held by Profile.numeric
+_NUMERIC_STATS = ["count", "mean", "std", "q1", "median", "q3"]
+
+
+class Profile:
+    """
+    Statistics of the columns of a data frame computed by profile().
+
+    Attributes
+    ----------
+    n_rows: int
+      Number of rows of the profiled data frame.
+    columns: list
+      The profiled columns.
+    no_nans: dict
+      Number of missing values of every column.
+    numeric: pandas.core.frame.DataFrame
+      Count of non-missing values, mean, population standard deviation and
+      quartiles of the numeric columns, one row per column.
+    categories: dict
+      For every categorical column, its distinct values, their counts and
+      the position of their first appearance.
+    corr: pandas.core.frame.DataFrame
+      Pearson correlation matrix of the numeric columns, None when not
+      computed.
+    """
+
+    def __init__(self, n_rows, columns, quantile_engine="exact"):
+        self.n_rows = n_rows
+        self.columns = list(columns)
+        self.quantile_engine = quantile_engine
+        self.no_nans = dict()
+        self.numeric = pd.DataFrame()
+        self.categories = dict()
+        self.corr = None
+        self._modes = dict()
+
+    @property
+    def summary(self):
+        """
+        Data frame with one row per column: number and percentage of missing
+        values and, for numeric columns, their statistics.
+        """
+        summary = pd.DataFrame({"no_nans": pd.Series(self.no_nans)}).reindex(
+            self.columns)
+        summary["perc_nans"] = (summary["no_nans"] / self.n_rows).round(2) \
+            if self.n_rows > 0 else np.nan
+        return summary.join(self.numeric.drop(columns="count"))
+
+    def _bounds(self, cols, method, threshold=None):
+        """
+        Returns the z-score or interquartile outlier bounds of the numeric
+        columns cols.
+        """
+        stats = self.numeric.loc[list(cols)]
+        with np.errstate(invalid="ignore"):
+            return _outlier_bounds(
+                method, threshold, mean=stats["mean"].to_numpy(),
+                std=stats["std"].to_numpy(), q1=stats["q1"].to_numpy(),
+                q3=stats["q3"].to_numpy())
+
+    def _fill_value(self, series, method):
+        """
+        Returns the value fast_missing_impute fills the column series with.
+        Modes of numeric columns are computed on first use and kept.
+        """
+        col = series.name
+        if method in ("mean", "median"):
+            return self.numeric.loc[col, method]
+        if col in self.categories:
+            uniques, counts, first = self.categories[col]
+            if len(counts) == 0:
+                return np.nan
+            tied = np.flatnonzero(counts == counts.max())
+            return uniques[tied[np.argmin(first[tied])]]
+        if col not in self._modes:
+            self._modes[col] = _column_mode(series)
+        return self._modes[col]
+
+
+def _check_stats(stats, df, cols):
+    """
+    Checks that stats were computed by profile() on a data frame of the
+    shape of df and cover the columns cols.
+    """
+    assert isinstance(stats, Profile), "stats must be computed by profile()"
+    assert stats.n_rows == len(df) and all(
+        col in stats.columns for col in cols), \
+        "stats must be computed by profile() on the same data frame " \
+        "and cover the selected columns"
+
+
+def set_stats_cache(maxsize=128):
+    """
+    Enables, resizes or disables the cache of column statistics. While it
+    is enabled, fast_outlier_id and fast_missing_impute keep the missing
+    value counts, moments, quartiles and category counts of the columns
+    they analyze, and reuse them when called again on the same unchanged
+    columns, for instance with another method or threshold_low_freq. The
+    statistics of maxsize columns are kept, the least recently used being
+    evicted first.
+
+    Columns are recognized by a fingerprint made of the addresses of their
+    buffers, their length, their dtype and a hash of 64 evenly spaced
+    values: replacing a column, or imputing it with fast_missing_impute,
+    invalidates its statistics, but modifying rows of a column in place
+    that the sample misses does not. Clear the cache with
+    set_stats_cache(0) after such modifications.
+
+    Parameters
+    ----------
+    maxsize: int
+      Maximum number of columns whose statistics are kept; 0 disables the
+      cache and drops its content.
+
+    Examples
+    --------
+    >>> set_stats_cache(256)
+    >>> fast_outlier_id(df, threshold_low_freq=0.05)
+    >>> fast_outlier_id(df, threshold_low_freq=0.01)
+
+    """
+    global _stats_cache
+    assert isinstance(maxsize, int) and maxsize >= 0, \
+        "maxsize must be a non-negative integer"
+    if maxsize == 0:
+        _stats_cache = None
+    elif _stats_cache is None:
+        _stats_cache = _LRUCache(maxsize)
+    else:
+        _stats_cache.resize(maxsize)
+
 
-    elif method == "mode":
+# Cache of column statistics, None while disabled
+_stats_cache = None
+
+
+class _LRUCache:
+    """
+    Dictionary keeping at most maxsize entries, evicting the least recently
+    used one first, and counting its hits and misses.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        self.resize(self.maxsize)
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self.entries) > maxsize:
+            self.entries.popitem(last=False)
+
+
+def _column_fingerprint(series, n_samples=64):
+    """
+    Cheap fingerprint of the data of a column: the addresses of its numpy
+    buffers, its length, its dtype and a hash of n_samples evenly spaced
+    values.
+    """
+    values = series.array
+    buffers = [getattr(values, name, None)
+               for name in ("_ndarray", "_data", "_mask", "codes")]
+    addresses = tuple(buffer.__array_interface__["data"][0]
+                      for buffer in buffers
+                      if isinstance(buffer, np.ndarray))
+    positions = np.linspace(0, len(series) - 1, min(
+        len(series), n_samples)).astype(np.intp)
+    sample = pd.util.hash_pandas_object(series.iloc[positions], index=False)
+    return (addresses or id(values), len(series), str(series.dtype),
+            hashlib.sha1(sample.to_numpy().tobytes()).hexdigest())
+
+
+def _cached_profile(df, cols, quantile_engine, quantile_error, quartiles):
+    """
+    Profile of the columns cols of df assembled from the statistics cache,
+    computing and caching the statistics it is missing. Quartiles are only
+    looked for when quartiles is set, under the quantile engine and error
+    they were computed with.
+    """
+    quartiles_key = (quantile_engine, quantile_error
+                     if quantile_engine == "sketch" else None)
+    keys = {col: _column_fingerprint(df[col]) for col in cols}
+    entries = {col: _stats_cache.get(keys[col]) for col in cols}
+    missing = [col for col in cols if entries[col] is None or (
+        quartiles and entries[col]["moments"] is not None and
+        quartiles_key not in entries[col]["quartiles"])]
+    if missing:
+        computed = _profile_columns(df, missing, quantile_engine,
+                                    quantile_error, quartiles)
+        for col in missing:
+            entry = entries[col] or {"quartiles": dict()}
+            entry["no_nans"] = computed.no_nans[col]
+            entry["categories"] = computed.categories.get(col)
+            entry["moments"] = None
+            if col in computed.numeric.index:
+                row = computed.numeric.loc[col].to_numpy()
+                entry["moments"] = tuple(row[:3])
+                if quartiles:
+                    entry["quartiles"][quartiles_key] = tuple(row[3:])
+            entries[col] = entry
+            _stats_cache.put(keys[col], entry)
+
+    stats = Profile(len(df), cols, quantile_engine)
+    numeric = dict()
+    for col in cols:
+        entry = entries[col]
+        stats.no_nans[col] = entry["no_nans"]
+        if entry["categories"] is not None:
+            stats.categories[col] = entry["categories"]
+        if entry["moments"] is not None:
+            numeric[col] = list(entry["moments"]) + list(
+                entry["quartiles"].get(quartiles_key, (np.nan,) * 3))
+    stats.numeric = pd.DataFrame.from_dict(
+        numeric, orient="index", columns=_NUMERIC_STATS).reindex(
+        [col for col in cols if col in numeric])
+    return stats
+
+
+def _uncache_columns(df, cols):
+    """
+    Drops the cached statistics of the columns cols of df, before they are
+    modified in place.
+    """
+    if _stats_cache is not None:
         for col in cols:
-            new_df[col] = new_df[col].fillna(mode(new_df[col]), inplace=False)
+            _stats_cache.discard(_column_fingerprint(df[col]))
+
+
+@contextlib.contextmanager
+def instrument(memory=True, logger=None):
+    """
+    Records the stages of the pyedahelper functions called within the
+    with block: validation, statistics, rendering and so on, with the wall
+    time, the number of rows and columns processed and the peak number of
+    bytes allocated by each. Outside of such a block the functions record
+    nothing and the instrumentation costs a few attribute lookups.
+
+    Parameters
+    ----------
+    memory: bool
+      Whether to trace the memory allocations with tracemalloc, which slows
+      down the code being measured. Peak bytes are only reported on Python
+      3.9 and later.
+    logger: logging.Logger
+      If given, every stage is also logged at INFO level, with the record
+      in the "pyedahelper" attribute of the log record.
+
+    Returns
+    -------
+    Instrumentation
+      The records of the stages, in the order they completed.
+
+    Examples
+    --------
+    >>> with instrument() as stages:
+    >>>     fast_outlier_id(df, method="interquartile")
+    >>> stages.to_dict()
+
+    """
+    recorder = Instrumentation(logger)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    _recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorders.remove(recorder)
+        if started:
+            tracemalloc.stop()
+
+
+class Instrumentation:
+    """
+    Stages recorded by instrument(), as a list of dicts with keys
+    "function", "stage", "seconds", "rows", "cols" and "peak_bytes" (None
+    when memory is not traced).
+    """
+
+    def __init__(self, logger=None):
+        self.records = list()
+        self.logger = logger
+
+    def add(self, record):
+        """
+        Appends the record of a stage and logs it.
+        """
+        self.records.append(record)
+        if self.logger is not None:
+            self.logger.info("%s %s: %.6fs, %s rows x %s cols, peak %s bytes",
+                             record["function"], record["stage"],
+                             record["seconds"], record["rows"],
+                             record["cols"], record["peak_bytes"],
+                             extra={"pyedahelper": record})
+
+    def to_dict(self):
+        """
+        Returns the records along with the total time per function.
+        """
+        totals = dict()
+        for record in self.records:
+            totals[record["function"]] = totals.get(
+                record["function"], 0) + record["seconds"]
+        return {"stages": [dict(record) for record in self.records],
+                "total_seconds": totals}
+
+
+# Recorders of the instrument() blocks currently open
+_recorders = list()
+
+
+def _stages(function, frame):
+    """
+    Returns the stage timer of a call of function on frame: a _StageTimer
+    when instrument() is active and a timer doing nothing otherwise.
+    """
+    if not _recorders:
+        return _NO_STAGES
+    return _StageTimer(function, getattr(frame, "shape", (None, None)))
+
+
+class _StageTimer:
+    """
+    Measures consecutive stages of a function: each call to done() closes
+    the stage started by the previous one, or by the creation of the timer.
+    """
+
+    def __init__(self, function, shape):
+        self.function = function
+        self.rows, self.cols = shape
+        self._start()
+
+    def _start(self):
+        self.memory = tracemalloc.is_tracing() and hasattr(
+            tracemalloc, "reset_peak")
+        if self.memory:
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+
+    def done(self, stage, rows=None, cols=None):
+        """
+        Records the stage that just completed, processing the given number
+        of rows and columns, those of the input by default.
+        """
+        seconds = time.perf_counter() - self.start
+        peak = tracemalloc.get_traced_memory()[1] - self.base \
+            if self.memory else None
+        record = {"function": self.function, "stage": stage,
+                  "seconds": seconds,
+                  "rows": self.rows if rows is None else rows,
+                  "cols": self.cols if cols is None else cols,
+                  "peak_bytes": peak}
+        for recorder in _recorders:
+            recorder.add(record)
+        self._start()
+
+
+class _NoStages:
+    """
+    Stage timer used when no instrument() block is active.
+    """
+
+    def done(self, stage, rows=None, cols=None):
+        pass
+
 
-    return new_df
+_NO_STAGES = _NoStages()
+
+
+def _columnar_library(data):
+    """
+    Returns "arrow" for a pyarrow Table, "polars" for a Polars DataFrame and
+    None otherwise. The type is recognized by its module, so neither
+    library is imported to check it.
+    """
+    module = type(data).__module__.split(".")[0]
+    name = type(data).__name__
+    if module == "pyarrow" and name == "Table":
+        return "arrow"
+    if module == "polars" and name == "DataFrame":
+        return "polars"
+    return None
+
+
+def _columnar_frame(data):
+    """
+    Returns a pandas view of a pyarrow Table or Polars DataFrame, together
+    with the name of its library, or data itself and None for any other
+    input. Polars frames are exported to Arrow, which shares their buffers.
+    """
+    library = _columnar_library(data)
+    if library is None:
+        return data, None
+    table = data.to_arrow() if library == "polars" else data
+    frame = pd.DataFrame(
+        {name: _arrow_column_view(table.column(i))
+         for i, name in enumerate(table.column_names)}, copy=False)
+    return frame, library
+
+
+def _arrow_column_view(column):
+    """
+    Converts a pyarrow ChunkedArray to a pandas column. Single-chunk integer
+    and float columns are wrapped without copying their values: as a numpy
+    array, or as a nullable Int/Float array over the same buffer when they
+    have nulls, whose mask is the only new allocation. Other columns, and
+    columns of several chunks, are converted by pyarrow.
+    """
+    import pyarrow as pa
+    kind = column.type
+    if pa.types.is_dictionary(kind) and \
+            pa.types.is_unsigned_integer(kind.index_type):
+        # Polars categoricals have unsigned indices, which pandas does not
+        # read
+        column = column.cast(pa.dictionary(pa.int64(), kind.value_type,
+                                           kind.ordered))
+    if column.num_chunks != 1 or not (
+            pa.types.is_integer(kind) or pa.types.is_floating(kind)) or \
+            pa.types.is_float16(kind):
+        return column.to_pandas()
+    array = column.chunk(0)
+    dtype = np.dtype(kind.to_pandas_dtype())
+    buffer = array.buffers()[1]
+    if buffer is None:
+        return column.to_pandas()
+    values = np.frombuffer(buffer, dtype=dtype, count=len(array),
+                           offset=array.offset * dtype.itemsize)
+    if array.null_count == 0:
+        return values
+    missing = array.is_null().to_numpy(zero_copy_only=False)
+    if dtype.kind == "f":
+        # NaN counts as missing, as it does in pandas
+        return pd.arrays.FloatingArray(values, missing | np.isnan(values))
+    return pd.arrays.IntegerArray(values, missing)
+
+
+def _to_columnar(frame, library):
+    """
+    Converts a pandas result to the library of the input it was computed
+    from.
+    """
+    import pyarrow as pa
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if library == "polars":
+        import polars as pl
+        return pl.from_arrow(table)
+    return table
+
+
+def _columnar_summary(summary, data, library):
+    """
+    Converts the summary of fast_outlier_id to the library of data, with the
+    column types of data. Arrow columns hold values of a single type, so the
+    outlier values of a summary mixing numeric and categorical columns are
+    converted to strings.
+    """
+    summary = summary.copy(deep=False)
+    summary["type"] = [str(data.schema[col] if library == "polars" else
+                           data.schema.field(col).type)
+                       for col in summary["column_name"]]
+    if "outlier_values" in summary and \
+            summary["outlier_method"].nunique() > 1:
+        summary["outlier_values"] = [
+            [str(value) for value in values]
+            for values in summary["outlier_values"]]
+    return _to_columnar(summary, library)
+
+
+def _columnar_rows(data, library, keep, return_mask):
+    """
+    Returns the rows of data where keep is set, or with return_mask the
+    mask itself, in the library of data.
+    """
+    if library == "polars":
+        import polars as pl
+        return pl.Series(keep) if return_mask else data.filter(
+            pl.Series(keep))
+    import pyarrow as pa
+    return pa.array(keep) if return_mask else data.filter(pa.array(keep))
+
+
+def _columnar_fill(data, library, frame, fill_values):
+    """
+    Returns a copy of data, in its own library, with the missing values of
+    the columns named in fill_values filled as _apply_fill_values fills
+    them; frame is the pandas view of data. Integer columns filled with a
+    fractional value become float64 and dictionary columns are encoded
+    again after filling. The columns that are not imputed are shared with
+    data.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    table = data.to_arrow() if library == "polars" else data
+    for col, value in fill_values.items():
+        missing = frame[col].isna().to_numpy()
+        per_row = isinstance(value, np.ndarray)
+        if per_row:
+            missing &= ~pd.isna(value)
+        elif pd.isna(value):
+            continue
+        if not missing.any():
+            continue
+        column = table[col]
+        kind = column.type
+        if pa.types.is_dictionary(kind):
+            kind = kind.value_type
+        if pa.types.is_integer(kind) and np.any(np.asarray(
+                value[missing] if per_row else value, dtype=np.float64) % 1):
+            # a fractional mean or median does not fit integers
+            kind = pa.float64()
+            column = column.cast(kind)
+        if per_row:
+            fill = pa.array(value, mask=~missing,
+                            from_pandas=True).cast(kind)
+        else:
+            fill = pa.scalar(value.item() if isinstance(value, np.generic)
+                             else value).cast(kind)
+        filled = pc.if_else(pa.array(missing), fill, column)
+        if pa.types.is_dictionary(column.type):
+            filled = filled.dictionary_encode()
+        table = table.set_column(table.schema.get_field_index(col), col,
+                                 filled)
+    if library == "polars":
+        import polars as pl
+        return pl.from_arrow(table)
+    return table
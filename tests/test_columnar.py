@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pyedahelper import pyedahelper
+
+pa = pytest.importorskip("pyarrow")
+
+
+def make_table():
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=300)
+    a[::11] = np.nan
+    b = pd.array(rng.integers(0, 90, 300), dtype="Int64")
+    b[::13] = pd.NA
+    c = rng.choice(list("abcdef"), 300, p=[.4, .3, .2, .06, .03, .01])
+    c = np.where(np.arange(300) % 7 == 0, None, c)
+    return pa.table({"a": pa.array(a, from_pandas=True),
+                     "b": pa.array(b), "c": pa.array(c)})
+
+
+def test_view_shares_buffers():
+    """
+    Function tests that numeric Arrow columns are read without copying
+    their values.
+    """
+    table = make_table()
+    frame, library = pyedahelper._columnar_frame(table)
+    assert library == "arrow"
+    for col in ["a", "b"]:
+        values = np.frombuffer(table[col].chunk(0).buffers()[1],
+                               dtype=np.float64 if col == "a" else np.int64)
+        assert np.shares_memory(frame[col].array._data, values)
+    pd.testing.assert_frame_equal(
+        frame, table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype(),
+                                             pa.float64(): pd.Float64Dtype()
+                                             }.get), check_dtype=False)
+
+
+def test_arrow_results():
+    """
+    Function tests that Arrow tables give Arrow results matching the ones
+    computed on the equivalent pandas data frame.
+    """
+    table = make_table()
+    df = table.to_pandas()
+
+    summary = pyedahelper.fast_outlier_id(table, output="index")
+    assert isinstance(summary, pa.Table)
+    expected = pyedahelper.fast_outlier_id(df, output="index")
+    assert summary["type"].to_pylist() == ["double", "int64", "string"]
+    assert summary["no_outliers"].to_pylist() == \
+        expected["no_outliers"].tolist()
+    assert summary["outlier_index"].to_pylist() == \
+        [index.tolist() for index in expected["outlier_index"]]
+    values = pyedahelper.fast_outlier_id(table, ["a", "c"])
+    assert values["outlier_values"].type == pa.list_(pa.string())
+
+    filled = pyedahelper.fast_missing_impute(table, "mean", ["a", "b"])
+    assert isinstance(filled, pa.Table)
+    assert filled["b"].type == pa.float64()
+    assert filled["c"].chunk(0).buffers()[2].address == \
+        table["c"].chunk(0).buffers()[2].address
+    expected = pyedahelper.fast_missing_impute(df, "mean", ["a", "b"])
+    np.testing.assert_allclose(filled["a"].to_numpy(), expected["a"])
+    np.testing.assert_allclose(filled["b"].to_numpy(), expected["b"])
+    filled = pyedahelper.fast_missing_impute(table, "mode", ["c"])
+    assert filled["c"].to_pylist() == \
+        pyedahelper.fast_missing_impute(df, "mode", ["c"])["c"].tolist()
+    removed = pyedahelper.fast_missing_impute(table, "remove", ["a", "c"])
+    assert removed.num_rows == len(df.dropna(subset=["a", "c"]))
+    with pytest.raises(AssertionError):
+        pyedahelper.fast_missing_impute(table, "mean", ["a"], inplace=True)
+
+    corr = pyedahelper.fast_corr_matrix(table, ["a", "b", "c"])
+    assert corr.column_names == ["column_name", "a", "b"]
+    np.testing.assert_allclose(
+        corr.to_pandas().set_index("column_name").to_numpy(),
+        pyedahelper.fast_corr_matrix(df, ["a", "b"]).to_numpy())
+
+
+def test_polars_results():
+    """
+    Function tests that Polars data frames give Polars results, and that
+    categorical columns keep their type through imputation.
+    """
+    pl = pytest.importorskip("polars")
+    data = pl.from_arrow(make_table()).with_columns(
+        pl.col("c").cast(pl.Categorical))
+    summary = pyedahelper.fast_outlier_id(data, method="interquartile")
+    assert isinstance(summary, pl.DataFrame)
+    assert summary["column_name"].to_list() == ["a", "b", "c"]
+    filled = pyedahelper.fast_missing_impute(data, "mode", ["b", "c"],
+                                             by="a")
+    assert isinstance(filled, pl.DataFrame)
+    assert filled.schema == data.schema
+    filled = pyedahelper.fast_missing_impute(data, "mode", ["c"])
+    assert filled["c"].null_count() == 0
+    assert filled["c"].dtype == pl.Categorical
+    mask = pyedahelper.fast_missing_impute(data, "remove", ["a"],
+                                           return_mask=True)
+    assert isinstance(mask, pl.Series)
+    assert mask.sum() == data["a"].is_not_null().sum()
+    pairs = pyedahelper.fast_corr_matrix(data, ["a", "b"], top_k=1)
+    assert pairs.columns == ["column_1", "column_2", "corr"]
@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 import seaborn as sns
 from pytest import raises
 from pyedahelper import pyedahelper
@@ -59,3 +61,124 @@ def test_plot():
     assert p.get_title() == 'Correlation Matrix'
     assert 'matplotlib.collections.QuadMes' in str(p.get_children()[0])
     assert 'Spine' in str(p.get_children()[1])
+
+
+def test_blocked_matches_pandas():
+    """
+    This function tests that the blocked correlation engine matches the
+    pairwise-complete correlation of pandas on data with missing values,
+    constant and nullable columns
+    """
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(3000, 4)) * [1, 10, 1e3, 1]
+                        + [0, 5, 1e6, 0], columns=list("abcd"))
+    data["d"] = data["a"] * 2 + rng.normal(size=3000)
+    data = data.mask(rng.random(data.shape) < 0.2)
+    data["e"] = 3.3
+    data["f"] = pd.array(rng.integers(0, 5, 3000), dtype="Int16")
+    data.loc[:10, "f"] = pd.NA
+    expected = data.astype(float).corr()
+
+    corr = pyedahelper._corr_frame(data, block_rows=777)
+    np.testing.assert_allclose(corr, expected, atol=1e-12)
+
+    chunks = [data.iloc[i:i + 500] for i in range(0, len(data), 500)]
+    corr = pyedahelper.fast_corr_chunked(chunks, list(data.columns))
+    np.testing.assert_allclose(corr, expected, atol=1e-12)
+    assert list(corr.columns) == list(data.columns)
+
+
+def test_chunked_input():
+    """
+    This function tests the inputs of pyedahelper.fast_corr_chunked and that
+    it leaves out the non-numeric columns
+    """
+    col_name = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width',
+                'species']
+    corr = pyedahelper.fast_corr_chunked(lambda: [iris[:75], iris[75:]],
+                                         col_name)
+    assert list(corr.columns) == col_name[:4]
+    np.testing.assert_allclose(corr, iris[col_name[:4]].corr())
+
+    with raises(TypeError):
+        pyedahelper.fast_corr_chunked([iris], tuple(col_name))
+    with raises(ValueError):
+        pyedahelper.fast_corr_chunked([iris], [1, 2])
+    with raises(ValueError):
+        pyedahelper.fast_corr_chunked([iris], ['sepal_length', 'abc'])
+    with raises(ValueError):
+        pyedahelper.fast_corr_chunked([], col_name)
+
+
+def test_matrix():
+    """
+    This function tests that pyedahelper.fast_corr_matrix returns the
+    correlations of the numeric columns, or their strongest pairs, without
+    creating any figure
+    """
+    import matplotlib.pyplot as plt
+    plt.close("all")
+    col_name = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width',
+                'species']
+    expected = iris[col_name[:4]].corr()
+    corr = pyedahelper.fast_corr_matrix(iris, col_name)
+    np.testing.assert_allclose(corr, expected)
+    assert list(corr.index) == col_name[:4]
+
+    top = pyedahelper.fast_corr_matrix(iris, [0, 1, 2, 3], top_k=2)
+    assert list(top.columns) == ["column_1", "column_2", "corr"]
+    pairs = sorted(((a, b) for i, a in enumerate(col_name[:4])
+                    for b in col_name[i + 1:4]),
+                   key=lambda pair: -abs(expected.loc[pair]))
+    assert list(top[["column_1", "column_2"]].itertuples(
+        index=False, name=None)) == pairs[:2]
+    np.testing.assert_allclose(top["corr"][0], expected.loc[pairs[0]])
+    assert len(pyedahelper.fast_corr_matrix(iris, [0, 1, 2, 3],
+                                            top_k=100)) == 6
+    assert plt.get_fignums() == []
+
+    with raises(ValueError):
+        pyedahelper.fast_corr_matrix(iris, [0, 1], top_k=0)
+    with raises(TypeError):
+        pyedahelper.fast_corr_matrix(iris.to_numpy(), [0, 1])
+
+
+def test_save(tmp_path):
+    """
+    This function tests that pyedahelper.fast_corr saves the plot without
+    leaving a pyplot figure open when given a path
+    """
+    import matplotlib.pyplot as plt
+    plt.close("all")
+    path = tmp_path / "corr.png"
+    p = pyedahelper.fast_corr(iris, [0, 1, 2, 3], save_path=str(path))
+    assert path.stat().st_size > 0
+    assert p.get_title() == 'Correlation Matrix'
+    assert plt.get_fignums() == []
+
+
+def test_rank_methods():
+    """
+    This function tests the Spearman and Kendall correlations of
+    pyedahelper.fast_corr_matrix against pandas, with and without worker
+    processes
+    """
+    rng = np.random.default_rng(1)
+    data = pd.DataFrame(rng.normal(size=(500, 4)).round(1),
+                        columns=list("abcd"))
+    data["e"] = pd.array(rng.integers(0, 5, 500), dtype="Int16")
+    data["f"] = 1.0
+    col_name = list(data.columns)
+    for method in ["spearman", "kendall"]:
+        expected = data.astype(float).corr(method=method)
+        corr = pyedahelper.fast_corr_matrix(data, col_name, method=method)
+        np.testing.assert_allclose(corr, expected, atol=1e-12)
+
+    data.loc[::7, "a"] = np.nan
+    expected = data.astype(float).corr(method="kendall")
+    corr = pyedahelper.fast_corr_matrix(data, col_name, method="kendall",
+                                        n_jobs=2)
+    np.testing.assert_allclose(corr, expected, atol=1e-12)
+
+    with raises(ValueError):
+        pyedahelper.fast_corr_matrix(data, col_name, method="cosine")
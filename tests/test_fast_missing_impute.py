@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import pandas as pd
 from pyedahelper import pyedahelper
 from statistics import mode
@@ -176,3 +177,196 @@ def test_mode():
     assert sample_mode["a"][5] == mode(test_data["a"])
     assert sample_mode["e"][1] == mode(test_data["e"])
     assert sample_mode.shape == test_data.shape  # dimensions shouldn't change
+
+
+def test_median_sketch():
+    """
+    Tests that the sketch quantile engine imputes the exact median when the
+    columns are small
+    """
+    sample_median = pyedahelper.fast_missing_impute(df=test_data,
+                                                    method="median",
+                                                    cols=["a", "d"],
+                                                    quantile_engine="sketch")
+    assert sample_median["a"][5] == test_data["a"].median()
+    assert sample_median["d"][4] == test_data["d"].median()
+    with pytest.raises(AssertionError,
+                       match="quantile_engine must be either"):
+        pyedahelper.fast_missing_impute(df=test_data, method="median",
+                                        cols=["a"], quantile_engine="fast")
+
+
+def test_n_jobs():
+    """
+    Tests that computing the statistics in worker processes imputes the
+    same values as the serial computation
+    """
+    for method, cols in [("mean", ["a", "c", "d"]),
+                         ("median", ["a", "c", "d"]),
+                         ("mode", ["a", "b", "c", "e"])]:
+        serial = pyedahelper.fast_missing_impute(df=test_data, method=method,
+                                                 cols=cols)
+        parallel = pyedahelper.fast_missing_impute(df=test_data,
+                                                   method=method, cols=cols,
+                                                   n_jobs=2)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_narrow_and_nullable_dtypes():
+    """
+    Tests that narrow and nullable numeric columns can be imputed with the
+    numeric methods and keep their dtype
+    """
+    narrow = pd.DataFrame({"f32": test_data["d"].astype("float32"),
+                           "nullable": test_data["a"].astype("Int32")})
+    for method in ["mean", "median"]:
+        for engine in ["exact", "sketch"]:
+            imputed = pyedahelper.fast_missing_impute(
+                df=narrow, method=method, cols=["f32", "nullable"],
+                quantile_engine=engine)
+            assert imputed.isna().sum().sum() == 0
+            assert imputed["f32"].dtype == "float32"
+    imputed = pyedahelper.fast_missing_impute(df=narrow, method="median",
+                                              cols=["f32"])
+    assert imputed["f32"][4] == narrow["f32"].median()
+
+
+def test_inplace():
+    """
+    Tests that inplace = True imputes the original dataframe, returns None
+    and leaves the buffers of the other columns untouched
+    """
+    data = test_data.copy()
+    untouched = data["d"].to_numpy()
+    assert pyedahelper.fast_missing_impute(df=data, method="mean",
+                                           cols=["a", "c"],
+                                           inplace=True) is None
+    assert data["a"].isna().sum() == 0
+    assert data["c"][2] == test_data["c"].mean()
+    assert np.shares_memory(data["d"].to_numpy(), untouched)
+
+    pyedahelper.fast_missing_impute(df=data, method="remove", cols=["e"],
+                                    inplace=True)
+    assert data.shape[0] == test_data.shape[0] - 1
+
+    with pytest.raises(AssertionError, match="inplace must be True or False"):
+        pyedahelper.fast_missing_impute(df=data, method="mean", cols=["a"],
+                                        inplace="yes")
+
+
+def test_remove_mask():
+    """
+    Tests that method = 'remove' with return_mask = True returns the rows to
+    keep instead of a filtered dataframe
+    """
+    mask = pyedahelper.fast_missing_impute(df=test_data, method="remove",
+                                           cols=["a", "e"], return_mask=True)
+    assert mask.dtype == bool
+    assert list(mask) == [True, False, True, True, True, False]
+    pd.testing.assert_frame_equal(
+        test_data[mask],
+        pyedahelper.fast_missing_impute(df=test_data, method="remove",
+                                        cols=["a", "e"]))
+    with pytest.raises(AssertionError, match="return_mask can only be used"):
+        pyedahelper.fast_missing_impute(df=test_data, method="mean",
+                                        cols=["a"], return_mask=True)
+
+
+def test_mode_ties_and_dtypes():
+    """
+    Tests that mode imputation ignores missing values, breaks ties by first
+    appearance and handles categorical columns
+    """
+    tied = pd.DataFrame({"num": [float("nan"), float("nan"), float("nan"),
+                                 2, 1, 1, 2],
+                         "chr": ["y", "x", float("nan"), "x", "y",
+                                 float("nan"), float("nan")]})
+    tied["cat"] = pd.Categorical(tied["chr"], categories=["x", "y"])
+    sample_mode = pyedahelper.fast_missing_impute(df=tied, method="mode",
+                                                  cols=["num", "chr", "cat"])
+    assert sample_mode["num"][0] == 2
+    assert sample_mode["chr"][2] == "y"
+    assert sample_mode["cat"][2] == "y"
+    assert sample_mode.isna().sum().sum() == 0
+
+    empty = pd.DataFrame({"a": [float("nan")] * 3})
+    assert pyedahelper.fast_missing_impute(
+        df=empty, method="mode", cols=["a"])["a"].isna().all()
+
+
+def test_grouped():
+    """
+    Tests that by = imputes each missing value with the statistic of its
+    own group
+    """
+    grouped = pd.DataFrame({"region": ["n", "n", "n", "s", "s", "s", "s",
+                                       float("nan")],
+                            "x": [1, float("nan"), 5, 10, 20, 20,
+                                  float("nan"), float("nan")],
+                            "y": ["a", "b", float("nan"), "c", "c",
+                                  float("nan"), "d", float("nan")]})
+    for method, expected in [("mean", [3, 50 / 3]), ("median", [3, 20])]:
+        imputed = pyedahelper.fast_missing_impute(df=grouped, method=method,
+                                                  cols=["x"], by="region")
+        assert imputed["x"][1] == expected[0]
+        assert imputed["x"][6] == expected[1]
+        # rows without a group are left missing
+        assert np.isnan(imputed["x"][7])
+
+    imputed = pyedahelper.fast_missing_impute(df=grouped, method="mode",
+                                              cols=["x", "y"],
+                                              by=["region"])
+    assert imputed["x"][1] == 1
+    assert imputed["x"][6] == 20
+    assert list(imputed["y"][[2, 5]]) == ["a", "c"]
+    assert imputed["y"].isna().sum() == 1
+
+    in_place = grouped.copy()
+    pyedahelper.fast_missing_impute(df=in_place, method="mode",
+                                    cols=["x", "y"], by="region",
+                                    inplace=True)
+    pd.testing.assert_frame_equal(in_place, imputed)
+
+    with pytest.raises(AssertionError, match="by columns cannot be imputed"):
+        pyedahelper.fast_missing_impute(df=grouped, method="mode",
+                                        cols=["y"], by="y")
+    with pytest.raises(AssertionError, match="by columns are not in"):
+        pyedahelper.fast_missing_impute(df=grouped, method="mode",
+                                        cols=["y"], by="zone")
+
+
+def test_grouped_mode_ties():
+    """
+    Tests that grouped modes break ties like ungrouped ones, toward the
+    value that appears first, for categorical columns too
+    """
+    tied = pd.DataFrame({"g": ["u"] * 5,
+                         "c": pd.Categorical(["z", "a", "z", "a", None],
+                                             categories=["a", "z"]),
+                         "o": ["z", "a", "z", "a", None]})
+    ungrouped = pyedahelper.fast_missing_impute(df=tied, method="mode",
+                                                cols=["c", "o"])
+    grouped = pyedahelper.fast_missing_impute(df=tied, method="mode",
+                                              cols=["c", "o"], by="g")
+    pd.testing.assert_frame_equal(grouped, ungrouped)
+    assert list(grouped.loc[4, ["c", "o"]]) == ["z", "z"]
+
+
+def test_single_copy():
+    """
+    Tests that imputing a copy of a data frame allocates about one copy of
+    it, with the statistics read from the columns in place
+    """
+    import tracemalloc
+
+    wide = pd.DataFrame(np.random.default_rng(0).normal(size=(100000, 8)),
+                        columns=list("abcdefgh"))
+    wide.iloc[::7] = np.nan
+    tracemalloc.start()
+    imputed = pyedahelper.fast_missing_impute(df=wide, method="mean",
+                                              cols=list(wide.columns))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 1.5 * wide.memory_usage().sum()
+    assert not imputed.isna().any().any()
+    assert wide.isna().any().all()
@@ -1,5 +1,7 @@
 import pytest
+import numpy as np
 import pandas as pd
+from scipy import stats
 from pyedahelper import pyedahelper
 
 test_df_1 = {
@@ -58,3 +60,250 @@ def test_response_fast_outliers_id():
     assert answer1.no_outliers.sum() == 0
     assert answer2.perc_nans.sum() == 0.06
     assert answer2.no_outliers.sum() == 6
+
+
+def test_vectorized_matches_per_column():
+    """
+    Function tests that the block computation flags the same values as a
+    column by column computation.
+    """
+    rng = np.random.default_rng(123)
+    wide = pd.DataFrame(rng.standard_t(3, size=(200, 6)),
+                        columns=list("abcdef"))
+    wide.iloc[::7, 1] = float("nan")
+    wide["g"] = rng.integers(0, 50, size=200)
+
+    for method in ["z-score", "interquartile"]:
+        answer = pyedahelper.fast_outlier_id(wide, method=method)
+        for _, row in answer.iterrows():
+            values = wide[row.column_name].dropna()
+            if method == "z-score":
+                expected = values[np.abs(stats.zscore(values)) > 2]
+            else:
+                q1, q3 = np.quantile(values, [0.25, 0.75])
+                iqr = q3 - q1
+                expected = values[(values < q1 - 1.5 * iqr) |
+                                  (values > q3 + 1.5 * iqr)]
+            np.testing.assert_array_equal(row.outlier_values,
+                                          expected.to_numpy())
+            assert row.no_outliers == len(expected)
+
+
+def test_chunked_matches_in_memory():
+    """
+    Function tests that the streaming version flags the same rows as
+    fast_outlier_id when the data is fed in chunks.
+    """
+    chunks = [test_df_2.iloc[i:i + 7] for i in range(0, len(test_df_2), 7)]
+    for method in ["z-score", "interquartile"]:
+        expected = pyedahelper.fast_outlier_id(test_df_2, method=method)
+        answer = pyedahelper.fast_outlier_id_chunked(chunks, method=method)
+        assert list(answer.column_name) == list(expected.column_name)
+        assert list(answer.no_nans) == list(expected.no_nans)
+        assert list(answer.no_outliers) == list(expected.no_outliers)
+        assert list(answer.perc_outliers) == list(expected.perc_outliers)
+        for _, row in answer.iterrows():
+            assert row.outlier_index.dtype == np.int32
+
+    answer = pyedahelper.fast_outlier_id_chunked(lambda: iter(chunks))
+    np.testing.assert_array_equal(answer.outlier_index[0], [0, 1])
+
+    # single pass iterators cannot be read twice
+    with pytest.raises(AssertionError):
+        pyedahelper.fast_outlier_id_chunked(iter(chunks))
+
+
+def test_quantile_sketch():
+    """
+    Function tests the rank error and merging of the quantile sketch.
+    """
+    values = np.random.default_rng(0).lognormal(size=100000)
+    sketch = pyedahelper._QuantileSketch()
+    other = pyedahelper._QuantileSketch()
+    for part in np.array_split(values[:50000], 10):
+        sketch.update(part)
+    other.update(values[50000:])
+    sketch.merge(other)
+
+    assert sketch.count == len(values)
+    assert sum(len(level) for level in sketch._levels) < 3 * sketch.k
+    for q in [0.1, 0.25, 0.5, 0.75, 0.9]:
+        rank = np.mean(values <= sketch.quantile(q))
+        assert abs(rank - q) < 0.02
+
+    # entries outside valid are left out like NaN
+    masked = pyedahelper._QuantileSketch()
+    masked.update(np.concatenate([values, np.full(1000, 1e9)]),
+                  np.arange(len(values) + 1000) < len(values))
+    assert masked.count == len(values)
+    assert masked.quantile(1.0) < 1e9
+
+
+def test_sketch_quantile_engine():
+    """
+    Function tests the sketch quantile engine of the interquartile method.
+    """
+    # small columns are never compacted, so the sketch is exact
+    expected = pyedahelper.fast_outlier_id(test_df_2, method="interquartile")
+    answer = pyedahelper.fast_outlier_id(test_df_2, method="interquartile",
+                                         quantile_engine="sketch")
+    assert list(answer.no_outliers) == list(expected.no_outliers)
+
+    big = pd.DataFrame({"x": np.random.default_rng(1).normal(size=50000)})
+    exact = pyedahelper.fast_outlier_id(big, method="interquartile")
+    approx = pyedahelper.fast_outlier_id(big, method="interquartile",
+                                         quantile_engine="sketch",
+                                         quantile_error=0.005)
+    assert abs(approx.no_outliers[0] - exact.no_outliers[0]) < 100
+
+    with pytest.raises(AssertionError):
+        pyedahelper.fast_outlier_id(test_df_2, quantile_engine="tdigest")
+
+
+def test_output_index_and_mask():
+    """
+    Function tests the index, mask and bitset outputs of fast_outlier_id.
+    """
+    values = pyedahelper.fast_outlier_id(test_df_2)
+    index = pyedahelper.fast_outlier_id(test_df_2, output="index")
+    mask = pyedahelper.fast_outlier_id(test_df_2, output="mask")
+    bitset = pyedahelper.fast_outlier_id(test_df_2, output="bitset")
+
+    assert "outlier_values" not in index.columns
+    for i in range(len(values)):
+        col = test_df_2[values.column_name[i]]
+        assert index.outlier_index[i].dtype == np.int32
+        assert mask.outlier_mask[i].dtype == bool
+        assert len(mask.outlier_mask[i]) == len(test_df_2)
+        np.testing.assert_array_equal(
+            np.flatnonzero(mask.outlier_mask[i]), index.outlier_index[i])
+        np.testing.assert_array_equal(
+            np.unpackbits(bitset.outlier_bitset[i])[:len(test_df_2)],
+            mask.outlier_mask[i])
+        assert len(index.outlier_index[i]) == values.no_outliers[i]
+        if values.outlier_method[i] == "low-freq":
+            assert set(col.iloc[index.outlier_index[i]]) == set(
+                values.outlier_values[i])
+        else:
+            np.testing.assert_array_equal(col.iloc[index.outlier_index[i]],
+                                          values.outlier_values[i])
+
+    with pytest.raises(AssertionError):
+        pyedahelper.fast_outlier_id(test_df_2, output="list")
+
+
+def test_n_jobs_matches_serial():
+    """
+    Function tests that sharding the columns across worker processes gives
+    the same summary as the serial computation.
+    """
+    rng = np.random.default_rng(7)
+    wide = pd.DataFrame(rng.standard_t(3, size=(500, 9)),
+                        columns=["c" + str(i) for i in range(9)])
+    wide.iloc[::11, 3] = float("nan")
+    wide["cat"] = test_df_2.col_B.sample(500, replace=True,
+                                         random_state=1).to_numpy()
+
+    for method in ["z-score", "interquartile"]:
+        serial = pyedahelper.fast_outlier_id(wide, method=method,
+                                             output="index")
+        parallel = pyedahelper.fast_outlier_id(wide, method=method,
+                                               output="index", n_jobs=3)
+        pd.testing.assert_frame_equal(serial.drop(columns="outlier_index"),
+                                      parallel.drop(columns="outlier_index"))
+        for a, b in zip(serial.outlier_index, parallel.outlier_index):
+            np.testing.assert_array_equal(a, b)
+
+    with pytest.raises(AssertionError):
+        pyedahelper.fast_outlier_id(wide, n_jobs=0)
+
+
+def test_low_freq_categorical_dtypes():
+    """
+    Function tests the low-frequency path on object, categorical and string
+    columns.
+    """
+    col = test_df_2.col_B
+    score = col.value_counts() / col.count()
+    expected = score[score < 0.05]
+
+    frame = pd.DataFrame({"obj": col,
+                          "cat": col.astype("category"),
+                          "str": col.astype("string")})
+    frame["cat"] = frame["cat"].cat.add_categories(["unused"])
+    answer = pyedahelper.fast_outlier_id(frame)
+    assert list(answer.column_name) == ["obj", "cat", "str"]
+    for _, row in answer.iterrows():
+        assert row.outlier_method == "low-freq"
+        assert row.no_nans == 1
+        assert row.no_outliers == (col.isin(expected.index)).sum()
+        assert row.perc_outliers == round(expected.sum(), 2)
+        assert sorted(row.outlier_values) == sorted(expected.index)
+
+    index = pyedahelper.fast_outlier_id(frame, output="index")
+    for positions in index.outlier_index:
+        np.testing.assert_array_equal(
+            positions, np.flatnonzero(col.isin(expected.index)))
+
+
+def test_narrow_and_nullable_dtypes():
+    """
+    Function tests that narrow and nullable numeric columns are analyzed and
+    give the same outliers as their float64 equivalent.
+    """
+    values = test_df_2.col_A
+    frame = pd.DataFrame({"f64": values,
+                          "f32": values.astype("float32"),
+                          "i16": values.fillna(0).astype("int16"),
+                          "nullable": values.astype("Int32"),
+                          "flag": values > 3})
+    frame.loc[2, "i16"] = 1000
+    for method in ["z-score", "interquartile"]:
+        answer = pyedahelper.fast_outlier_id(frame, method=method,
+                                             output="index")
+        assert list(answer.column_name) == ["f64", "f32", "i16", "nullable"]
+        assert list(answer.no_nans) == [1, 1, 0, 1]
+        for i in [1, 3]:
+            np.testing.assert_array_equal(answer.outlier_index[i],
+                                          answer.outlier_index[0])
+        np.testing.assert_array_equal(answer.outlier_index[2], [0, 1, 2])
+
+
+def test_mad_and_threshold():
+    """
+    Function tests the mad method and the threshold parameter against their
+    definitions.
+    """
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({"t": rng.standard_t(2, size=2000),
+                          "i": rng.integers(0, 100, 2000).astype("int16")})
+    frame.loc[::7, "t"] = np.nan
+    frame.loc[3, "i"] = 5000
+    answer = pyedahelper.fast_outlier_id(frame, method="mad", output="mask")
+    assert set(answer.outlier_method) == {"MAD"}
+    for i, col in enumerate(frame.columns):
+        values = frame[col].astype(float)
+        median = values.median()
+        mad = (values - median).abs().median()
+        expected = 0.6745 * (values - median).abs() / mad > 3.5
+        np.testing.assert_array_equal(answer.outlier_mask[i], expected)
+    strict = pyedahelper.fast_outlier_id(frame, method="mad", threshold=10)
+    assert (strict.no_outliers <= answer.no_outliers).all()
+
+    values = frame.t.dropna()
+    for threshold in [1, 3]:
+        answer = pyedahelper.fast_outlier_id(frame, ["t"], threshold=threshold)
+        score = np.abs(values - values.mean()) / values.std(ddof=0)
+        assert answer.no_outliers[0] == (score > threshold).sum()
+        chunked = pyedahelper.fast_outlier_id_chunked(
+            [frame[:1000], frame[1000:]], ["t"], threshold=threshold)
+        assert chunked.no_outliers[0] == answer.no_outliers[0]
+    default = pyedahelper.fast_outlier_id(frame, method="interquartile")
+    explicit = pyedahelper.fast_outlier_id(frame, method="interquartile",
+                                           threshold=1.5)
+    pd.testing.assert_frame_equal(default, explicit)
+
+    with pytest.raises(AssertionError, match="threshold must be"):
+        pyedahelper.fast_outlier_id(frame, threshold=0)
+    with pytest.raises(AssertionError, match="does not support the mad"):
+        pyedahelper.fast_outlier_id_chunked([frame], method="mad")
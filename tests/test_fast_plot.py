@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import pandas as pd
 from pyedahelper import pyedahelper
 
@@ -159,3 +160,198 @@ def test_bar():
     with pytest.raises(Exception):
         pyedahelper.fast_plot(df=df, x="col_chr", y="col_date",
                               plot_type="bar")
+
+
+def test_narrow_numeric_dtypes():
+    """
+    Function tests that narrow numeric columns are treated as numeric by
+    pyedahelper.fast_plot function.
+    """
+    narrow = pd.DataFrame({"col_int": df["col_int"].astype("int16"),
+                           "col_flt": df["col_flt"].astype("float32")})
+    a = pyedahelper.fast_plot(df=narrow, x="col_int", y="col_flt",
+                              plot_type="bar")
+    assert a.encoding['x']['shorthand'] == "col_int:N"
+    assert a.encoding['y']['shorthand'] == "sum(col_flt)"
+
+    b = pyedahelper.fast_plot(df=narrow, x="col_int", y="col_flt",
+                              plot_type="scatter")
+    assert b.encoding['x']['shorthand'] == "col_int:O"
+
+
+def test_reduced_data():
+    """
+    Function tests that pyedahelper.fast_plot only embeds the aggregated or
+    downsampled data the chart needs.
+    """
+    big = pd.DataFrame({"x": np.arange(20000) % 50,
+                        "t": np.linspace(0, 100, 20000),
+                        "y": np.sin(np.linspace(0, 100, 20000)),
+                        "other": "unused"})
+
+    bar = pyedahelper.fast_plot(df=big, x="x", y="y", plot_type="bar")
+    assert list(bar.data.columns) == ["x", "y"]
+    assert len(bar.data) == 50
+    np.testing.assert_allclose(bar.data.set_index("x")["y"],
+                               big.groupby("x")["y"].sum())
+    assert bar.encoding['y']['shorthand'] == "sum(y)"
+
+    # unobserved categories do not add bars
+    levels = pd.DataFrame({"x": pd.Categorical(["a", "b", "a"],
+                                               categories=list("abcd")),
+                           "y": [1.0, 2.0, 3.0]})
+    bar = pyedahelper.fast_plot(df=levels, x="x", y="y", plot_type="bar")
+    assert bar.data.to_dict("records") == [{"x": "a", "y": 4.0},
+                                           {"x": "b", "y": 2.0}]
+
+    scatter = pyedahelper.fast_plot(df=big, x="t", y="y",
+                                    plot_type="scatter", max_points=1000)
+    assert len(scatter.data) == 1000
+    # the extremes of the signal are kept
+    assert scatter.data["y"].max() > 0.99
+    assert scatter.data["y"].min() < -0.99
+    assert scatter.data["t"].iloc[0] == 0
+
+    full = pyedahelper.fast_plot(df=big, x="t", y="y", plot_type="scatter",
+                                 max_points=None)
+    assert len(full.data) == len(big)
+    default = pyedahelper.fast_plot(df=big, x="t", y="y",
+                                    plot_type="scatter")
+    assert len(default.data) == 5000
+    assert len(default.to_dict()["datasets"]) == 1
+
+    with pytest.raises(AssertionError, match="max_points must be None"):
+        pyedahelper.fast_plot(df=big, x="t", y="y", plot_type="scatter",
+                              max_points=1)
+
+    # summed series with more groups than max_points are downsampled too
+    daily = pd.DataFrame({
+        "d": np.repeat(pd.date_range("1970-01-01", periods=20000), 2),
+        "y": np.repeat(np.sin(np.linspace(0, 100, 20000)), 2),
+        "k": np.repeat(np.arange(20000).astype(str), 2)})
+    line = pyedahelper.fast_plot(df=daily, x="d", y="y", plot_type="line")
+    assert len(line.data) == 5000
+    assert line.data["y"].max() > 1.99
+    assert line.data["y"].min() < -1.99
+    sums = daily.groupby("d")["y"].sum()
+    np.testing.assert_allclose(line.data["y"], sums[line.data["d"]])
+    assert len(line.to_dict()["datasets"]) == 1
+    bar = pyedahelper.fast_plot(df=daily, x="k", y="y", plot_type="bar",
+                                max_points=100)
+    assert len(bar.data) == 100
+    assert bar.data["k"].is_unique
+
+
+def test_date_detection():
+    """
+    Function tests that dates are recognized from their dtype, and from
+    their values only when infer_dates is set.
+    """
+    dates = df.copy()
+    dates["col_tz"] = dates["col_date"].dt.tz_localize("UTC")
+    dates["col_obj"] = pd.Series(list(dates["col_date"]), dtype=object)
+
+    a = pyedahelper.fast_plot(df=dates, x="col_tz", y="col_int",
+                              plot_type="scatter")
+    assert a.encoding['x']['shorthand'] == "col_tz:O"
+    with pytest.raises(Exception, match="Y column cannot be a date type!"):
+        pyedahelper.fast_plot(df=dates, x="col_int", y="col_tz",
+                              plot_type="scatter")
+
+    b = pyedahelper.fast_plot(df=dates, x="col_obj", y="col_int",
+                              plot_type="scatter")
+    assert b.encoding['x']['shorthand'] == "col_obj"
+    c = pyedahelper.fast_plot(df=dates, x="col_obj", y="col_int",
+                              plot_type="scatter", infer_dates=True)
+    assert c.encoding['x']['shorthand'] == "col_obj:O"
+
+
+def test_url_transport(tmp_path):
+    """
+    Function tests that pyedahelper.fast_plot can write the chart data to a
+    file shared by the charts showing the same data.
+    """
+    data_dir = str(tmp_path)
+    a = pyedahelper.fast_plot(df=df, x="col_int", y="col_flt",
+                              plot_type="bar", transport="json",
+                              data_dir=data_dir, data_url="/static")
+    b = pyedahelper.fast_plot(df=df, x="col_int", y="col_flt",
+                              plot_type="line", transport="json",
+                              data_dir=data_dir, data_url="/static")
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert a.data.url == b.data.url == "/static/" + files[0].name
+    assert a.encoding['x']['shorthand'] == "col_int:N"
+    assert a.encoding['y']['shorthand'] == "sum(col_flt):Q"
+    assert "datasets" not in a.to_dict()
+    written = pd.read_json(files[0])
+    assert list(written.columns) == ["col_int", "col_flt"]
+
+    c = pyedahelper.fast_plot(df=df, x="col_date", y="col_flt",
+                              plot_type="scatter", transport="csv",
+                              data_dir=data_dir)
+    assert c.data.url.endswith(".csv")
+    assert c.data.format.type == "csv"
+    assert c.encoding['x']['shorthand'] == "col_date:O"
+    assert c.encoding['y']['shorthand'] == "col_flt:Q"
+    assert len(list(tmp_path.iterdir())) == 2
+
+    with pytest.raises(AssertionError, match="transport must be either"):
+        pyedahelper.fast_plot(df=df, x="col_int", y="col_flt",
+                              plot_type="bar", transport="arrow")
+
+
+def test_batch():
+    """
+    Function tests that pyedahelper.fast_plots builds every chart of the
+    batch like fast_plot, with charts of the same data sharing a dataset.
+    """
+    specs = [("col_date", "col_int", "line"),
+             ("col_int", "col_flt", "scatter"),
+             ("col_chr", "col_flt", "bar"),
+             ("col_date", "col_int", "line")]
+    chart = pyedahelper.fast_plots(df, specs, columns=2)
+    spec = chart.to_dict()
+    assert spec["columns"] == 2
+    assert len(spec["concat"]) == 4
+    assert len(spec["datasets"]) == 3
+    assert spec["concat"][0]["data"] == spec["concat"][3]["data"]
+
+    for sub, (x, y, plot_type) in zip(spec["concat"], specs):
+        single = pyedahelper.fast_plot(df=df, x=x, y=y,
+                                       plot_type=plot_type).to_dict()
+        assert sub["mark"] == single["mark"]
+        assert sub["encoding"] == single["encoding"]
+        assert spec["datasets"][sub["data"]["name"]] == \
+            list(single["datasets"].values())[0]
+
+    # only the reduced data is embedded, within the inline row limit
+    hourly = pd.DataFrame({
+        "d": pd.date_range("2000-01-01", periods=30000, freq="H"),
+        "a": np.sin(np.linspace(0, 100, 30000)),
+        "b": np.cos(np.linspace(0, 100, 30000))})
+    spec = pyedahelper.fast_plots(hourly, [("d", "a", "line"),
+                                           ("d", "b", "line"),
+                                           ("a", "b", "scatter")]).to_dict()
+    assert [len(rows) for rows in spec["datasets"].values()] == [5000] * 3
+
+    with pytest.raises(AssertionError, match="specs must be a non-empty"):
+        pyedahelper.fast_plots(df, [])
+    with pytest.raises(AssertionError, match="y Column must not be all"):
+        pyedahelper.fast_plots(df, [("col_int", "col_nan", "line")])
+    with pytest.raises(Exception, match="Y column cannot be a date type!"):
+        pyedahelper.fast_plots(df, [("col_int", "col_date", "scatter")])
+
+
+def test_batch_url_transport(tmp_path):
+    """
+    Function tests that pyedahelper.fast_plots writes the data shared by
+    charts to a single file.
+    """
+    chart = pyedahelper.fast_plots(
+        df, [("col_int", "col_flt", "bar"), ("col_int", "col_flt", "line")],
+        transport="csv", data_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    assert chart.concat[0].data.url == chart.concat[1].data.url
+    assert chart.concat[0].data.url.endswith(".csv")
+    assert "datasets" not in chart.to_dict()
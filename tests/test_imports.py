@@ -0,0 +1,15 @@
+import subprocess
+import sys
+
+
+def test_lazy_imports():
+    """
+    Function tests that importing pyedahelper loads neither the plotting
+    libraries nor scipy, which are imported on first use.
+    """
+    probe = ("import sys, pyedahelper.pyedahelper; "
+             "print(','.join(m for m in ['matplotlib', 'seaborn', 'altair',"
+             " 'scipy'] if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", probe], check=True,
+                            capture_output=True, text=True).stdout
+    assert output.strip() == ""
@@ -0,0 +1,105 @@
+import pytest
+import pandas as pd
+from pyedahelper import pyedahelper
+
+reference = pd.DataFrame({"a": [3, 2, 3, 4, 5, float('nan')],
+                          "b": ["a", float("nan"), "d", "d", "f", "e"],
+                          "c": [7, 10, float('nan'), 13, 4, 12]})
+batch = pd.DataFrame({"a": [float('nan'), 100],
+                      "b": [float("nan"), "z"],
+                      "c": [float('nan'), float('nan')]})
+
+
+def test_fit_transform():
+    """
+    Tests that the statistics come from the reference data and are applied
+    to new batches
+    """
+    imputer = pyedahelper.Imputer(method="mean", cols=["a", "c"])
+    assert imputer.fit(reference) is imputer
+    assert imputer.fill_values_ == {"a": reference["a"].mean(),
+                                    "c": reference["c"].mean()}
+    imputed = imputer.transform(batch)
+    assert list(imputed["a"]) == [reference["a"].mean(), 100]
+    assert list(imputed["c"]) == [reference["c"].mean()] * 2
+    assert imputed["b"].isna().sum() == 1
+
+    pd.testing.assert_frame_equal(
+        pyedahelper.Imputer(method="mode", cols=["a", "b"]).fit_transform(
+            reference),
+        pyedahelper.fast_missing_impute(reference, method="mode",
+                                        cols=["a", "b"]))
+
+    removed = pyedahelper.Imputer(method="remove", cols=["b"]).fit(
+        reference).transform(batch)
+    assert list(removed["b"]) == ["z"]
+
+
+def test_validation():
+    """
+    Tests that the imputer applies the fast_missing_impute validation rules
+    and must be fitted before use
+    """
+    with pytest.raises(AssertionError, match="must be fitted first"):
+        pyedahelper.Imputer(method="mean", cols=["a"]).transform(batch)
+    with pytest.raises(AssertionError,
+                       match="With non-numeric columns, can only use "
+                             "method = 'remove' or 'mode'"):
+        pyedahelper.Imputer(method="median", cols=["b"]).fit(reference)
+    with pytest.raises(AssertionError, match="Not a valid method"):
+        pyedahelper.Imputer(method="avg", cols=["a"]).fit(reference)
+
+
+def test_save_load(tmp_path):
+    """
+    Tests that saved statistics are restored by load
+    """
+    path = str(tmp_path / "imputer.json")
+    imputer = pyedahelper.Imputer(method="mode", cols=["a", "b"])
+    imputer.fit(reference).save(path)
+    loaded = pyedahelper.Imputer.load(path)
+    assert loaded.method == "mode"
+    assert loaded.fill_values_ == imputer.fill_values_
+    pd.testing.assert_frame_equal(loaded.transform(batch),
+                                  imputer.transform(batch))
+
+
+def test_save_load_types(tmp_path):
+    """
+    Tests that fill values keep their type through save and load, for
+    datetime and categorical columns and for dates and decimals held in
+    object columns
+    """
+    import datetime
+    import decimal
+
+    dated = pd.DataFrame({
+        "when": pd.to_datetime(["2021-03-04 05:06:07", None,
+                                "2021-03-04 05:06:07", "2020-01-01"]),
+        "zoned": pd.to_datetime(["2021-03-04", None, "2021-03-04",
+                                 "2020-01-01"]).tz_localize("Europe/Paris"),
+        "wait": pd.to_timedelta(["1d", None, "1d", "2h"]),
+        "level": pd.Categorical(["hi", None, "hi", "lo"]),
+        "code": pd.Categorical([7, None, 7, 3]),
+        "day": [datetime.date(2021, 3, 4), None, datetime.date(2021, 3, 4),
+                datetime.date(2020, 1, 1)],
+        "price": [decimal.Decimal("1.10"), None, decimal.Decimal("1.10"),
+                  decimal.Decimal("2")],
+        "flag": [True, None, True, False]})
+    path = str(tmp_path / "imputer.json")
+    imputer = pyedahelper.Imputer(method="mode", cols=list(dated.columns))
+    imputer.fit(dated).save(path)
+    loaded = pyedahelper.Imputer.load(path)
+    for col, value in imputer.fill_values_.items():
+        assert type(loaded.fill_values_[col]) == type(value)
+        assert loaded.fill_values_[col] == value
+    assert loaded.fill_values_["zoned"].tz.zone == "Europe/Paris"
+    pd.testing.assert_frame_equal(loaded.transform(dated),
+                                  imputer.transform(dated))
+    assert loaded.transform(dated)["when"].dtype == dated["when"].dtype
+
+    imputer = pyedahelper.Imputer(method="median", cols=["a", "c"])
+    imputer.fit(reference).save(path)
+    pd.testing.assert_frame_equal(
+        pyedahelper.Imputer.load(path).transform(batch),
+        imputer.transform(batch))
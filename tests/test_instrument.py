@@ -0,0 +1,61 @@
+import logging
+import numpy as np
+import pandas as pd
+from pyedahelper import pyedahelper
+
+df = pd.DataFrame({"a": [1.0, 2.0, np.nan, 4.0, 100.0],
+                   "b": [1, 2, 3, 4, 5],
+                   "c": ["x", "x", "y", "x", None]})
+
+
+def test_records_stages():
+    """
+    Function tests that pyedahelper.instrument records the stages of the
+    functions called in its block, and only those.
+    """
+    pyedahelper.fast_outlier_id(df)
+    with pyedahelper.instrument() as stages:
+        pyedahelper.fast_outlier_id(df)
+        pyedahelper.fast_missing_impute(df, "mean", ["a"])
+        pyedahelper.fast_corr_matrix(df, ["a", "b"])
+        pyedahelper.fast_plot(df, "b", "a", "bar")
+    pyedahelper.fast_outlier_id(df)
+
+    records = stages.to_dict()["stages"]
+    assert [(r["function"], r["stage"]) for r in records] == [
+        ("fast_outlier_id", "validation"),
+        ("fast_outlier_id", "numeric outliers"),
+        ("fast_outlier_id", "categorical outliers and summary"),
+        ("fast_missing_impute", "validation"),
+        ("fast_missing_impute", "fill values"),
+        ("fast_missing_impute", "fill"),
+        ("fast_corr_matrix", "validation"),
+        ("fast_corr_matrix", "correlation"),
+        ("fast_plot", "validation"),
+        ("fast_plot", "data reduction"),
+        ("fast_plot", "chart")]
+    assert records[1]["rows"] == 5 and records[1]["cols"] == 2
+    assert records[4]["cols"] == 1
+    assert all(r["seconds"] >= 0 for r in records)
+    assert all(r["peak_bytes"] is None or r["peak_bytes"] >= 0
+               for r in records)
+    assert set(stages.to_dict()["total_seconds"]) == {
+        "fast_outlier_id", "fast_missing_impute", "fast_corr_matrix",
+        "fast_plot"}
+
+
+def test_disabled_and_logging(caplog):
+    """
+    Function tests that no timer is created outside of instrument blocks,
+    and that the stages can be logged without tracing memory.
+    """
+    assert pyedahelper._stages("fast_plot", df) is pyedahelper._NO_STAGES
+
+    logger = logging.getLogger("pyedahelper.test")
+    with caplog.at_level(logging.INFO, logger="pyedahelper.test"):
+        with pyedahelper.instrument(memory=False, logger=logger) as stages:
+            pyedahelper.fast_missing_impute(df, "remove", ["a"])
+    assert [r["stage"] for r in stages.records] == ["validation", "remove"]
+    assert stages.records[1]["peak_bytes"] is None
+    assert [r.pyedahelper for r in caplog.records] == stages.records
+    assert pyedahelper._stages("fast_plot", df) is pyedahelper._NO_STAGES
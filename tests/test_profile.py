@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pyedahelper import pyedahelper
+
+rng = np.random.default_rng(0)
+df = pd.DataFrame({
+    "a": rng.normal(size=500),
+    "b": rng.integers(0, 9, 500).astype("int16"),
+    "c": rng.choice(list("abcdefgh"), 500,
+                    p=[.3, .3, .2, .1, .05, .03, .01, .01]).astype(object),
+    "d": pd.array(rng.integers(0, 5, 500), dtype="Int32"),
+    "e": pd.Categorical(rng.choice(list("xyz"), 500))})
+df.loc[::13, "a"] = np.nan
+df.loc[::17, "c"] = None
+df.loc[::19, "d"] = pd.NA
+
+
+def test_profile_statistics():
+    """
+    Function tests the statistics computed by pyedahelper.profile.
+    """
+    stats = pyedahelper.profile(df)
+    summary = stats.summary
+    assert list(summary.index) == list(df.columns)
+    assert list(summary["no_nans"]) == list(df.isna().sum())
+    numeric = df[["a", "b", "d"]].astype(float)
+    np.testing.assert_allclose(summary.loc[["a", "b", "d"], "mean"],
+                               numeric.mean())
+    np.testing.assert_allclose(summary.loc[["a", "b", "d"], "std"],
+                               numeric.std(ddof=0))
+    np.testing.assert_allclose(summary.loc[["a", "b", "d"], "median"],
+                               numeric.median())
+    np.testing.assert_allclose(stats.corr, numeric.corr())
+    assert pyedahelper.profile(df, cols=["a", "c"], corr=False).corr is None
+
+
+def test_functions_use_stats():
+    """
+    Function tests that the functions give the same results with the
+    statistics of pyedahelper.profile as without.
+    """
+    stats = pyedahelper.profile(df)
+    for method in ["z-score", "interquartile", "mad"]:
+        for output, threshold in [("values", None), ("mask", 1.2)]:
+            expected = pyedahelper.fast_outlier_id(
+                df, method=method, output=output, threshold=threshold)
+            result = pyedahelper.fast_outlier_id(
+                df, method=method, output=output, threshold=threshold,
+                stats=stats)
+            pd.testing.assert_frame_equal(result.iloc[:, :-1],
+                                          expected.iloc[:, :-1])
+            for a, b in zip(result.iloc[:, -1], expected.iloc[:, -1]):
+                np.testing.assert_array_equal(a, b)
+
+    for method, cols in [("mean", ["a", "b", "d"]),
+                         ("median", ["a", "b", "d"]),
+                         ("mode", list(df.columns))]:
+        pd.testing.assert_frame_equal(
+            pyedahelper.fast_missing_impute(df, method, cols, stats=stats),
+            pyedahelper.fast_missing_impute(df, method, cols))
+
+    pd.testing.assert_frame_equal(
+        pyedahelper.fast_corr_matrix(df, ["a", "b", "c"], stats=stats),
+        pyedahelper.fast_corr_matrix(df, ["a", "b", "c"]))
+
+
+def test_stats_mismatch():
+    """
+    Function tests that statistics of another data frame, or of other
+    columns, are refused.
+    """
+    stats = pyedahelper.profile(df, cols=["a", "c"], corr=False)
+    with pytest.raises(AssertionError, match="stats must be computed"):
+        pyedahelper.fast_outlier_id(df, stats=stats)
+    with pytest.raises(AssertionError, match="stats must be computed"):
+        pyedahelper.fast_missing_impute(df.iloc[:10], "mean", ["a"],
+                                        stats=stats)
+    with pytest.raises(AssertionError, match="stats must be computed"):
+        pyedahelper.fast_outlier_id(df, stats="stats")
+    with pytest.raises(AssertionError, match="stats must be computed"):
+        pyedahelper.fast_corr_matrix(df, ["a", "b"], stats=stats)
+    with pytest.raises(ValueError):
+        pyedahelper.fast_corr_matrix(df, ["a", "b"], stats=pyedahelper.profile(
+            df, corr=False))
+    with pytest.raises(ValueError):
+        pyedahelper.fast_corr_matrix(df, ["a", "b"], method="spearman",
+                                     stats=pyedahelper.profile(df))
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pyedahelper import pyedahelper
+
+
+@pytest.fixture
+def cache():
+    pyedahelper.set_stats_cache(8)
+    yield pyedahelper._stats_cache
+    pyedahelper.set_stats_cache(0)
+
+
+def make_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"a": rng.normal(size=300),
+                       "b": rng.integers(0, 9, 300).astype("int16"),
+                       "c": rng.choice(list("abcdef"), 300,
+                                       p=[.4, .3, .2, .06, .03, .01])})
+    df.loc[::11, "a"] = np.nan
+    df.loc[::7, "c"] = None
+    return df
+
+
+def test_cache_reuses_statistics():
+    """
+    Function tests that repeated calls on unchanged columns reuse the cached
+    statistics and give the results computed without the cache.
+    """
+    df = make_df()
+    runs = [("z-score", 0.05), ("z-score", 0.02), ("interquartile", 0.2)]
+    expected = [pyedahelper.fast_outlier_id(df, method=method,
+                                            threshold_low_freq=threshold)
+                for method, threshold in runs]
+    pyedahelper.set_stats_cache(8)
+    try:
+        cache = pyedahelper._stats_cache
+        for (method, threshold), summary in zip(runs, expected):
+            result = pyedahelper.fast_outlier_id(
+                df, method=method, threshold_low_freq=threshold)
+            pd.testing.assert_frame_equal(result.iloc[:, :-1],
+                                          summary.iloc[:, :-1])
+            for a, b in zip(result.iloc[:, -1], summary.iloc[:, -1]):
+                np.testing.assert_array_equal(a, b)
+        assert cache.misses == 3
+        # the interquartile run only computed the missing quartiles
+        assert cache.hits == 6
+
+        pd.testing.assert_frame_equal(
+            pyedahelper.fast_missing_impute(df, "median", ["a", "b"]),
+            df.fillna({"a": df["a"].median()}))
+        assert cache.hits == 8
+    finally:
+        pyedahelper.set_stats_cache(0)
+
+
+def test_cache_invalidation(cache):
+    """
+    Function tests the eviction of the least recently used columns and
+    that replaced or imputed columns are not served stale statistics.
+    """
+    df = make_df()
+    pyedahelper.fast_outlier_id(df, ["a", "b"])
+    assert len(cache.entries) == 2
+
+    df["a"] = df["a"] * 100
+    result = pyedahelper.fast_outlier_id(df, ["a"], output="mask")
+    np.testing.assert_array_equal(
+        result["outlier_mask"][0],
+        pyedahelper._numeric_outlier_mask(
+            df[["a"]].to_numpy(), df[["a"]].notna().to_numpy(),
+            "z-score")[:, 0])
+
+    pyedahelper.fast_missing_impute(df, "mean", ["a"], inplace=True)
+    assert pyedahelper.fast_outlier_id(df, ["a"])["no_nans"][0] == 0
+
+    pyedahelper.set_stats_cache(1)
+    assert len(cache.entries) == 1
+    with pytest.raises(AssertionError, match="maxsize"):
+        pyedahelper.set_stats_cache(-1)
+
+
+def test_cache_skips_mad_numeric_columns(cache):
+    """
+    Function tests that the "mad" method only caches the categorical
+    columns, whose counts it reuses, and gives the uncached results.
+    """
+    df = make_df()
+    result = pyedahelper.fast_outlier_id(df, method="mad")
+    assert len(cache.entries) == 1
+    assert cache.misses == 1
+    pyedahelper.set_stats_cache(0)
+    expected = pyedahelper.fast_outlier_id(df, method="mad")
+    pd.testing.assert_frame_equal(result.iloc[:, :-1],
+                                  expected.iloc[:, :-1])